@@ -12,10 +12,34 @@ import curses
 import random
 import time
 import math
+import struct
+import os
+import sys
+import json
+import argparse
+import unicodedata
+import tracemalloc
+import multiprocessing
+import threading
+import zlib
+import asyncio
+import socket
+import sqlite3
+import queue
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from functools import lru_cache
+from itertools import groupby
 from enum import Enum, auto
 from typing import List, Optional, Dict, Tuple
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # optional, only needed for the array-backed entity store
+    np = None
+
 # ═══════════════════════════════════════════════════════════════════════════
 # CONFIGURATION
 # ═══════════════════════════════════════════════════════════════════════════
@@ -24,6 +48,186 @@ TARGET_FPS = 30
 FRAME_TIME = 1.0 / TARGET_FPS
 MIN_WIDTH = 80
 MIN_HEIGHT = 24
+MAX_CATCHUP_TICKS = 5          # simulation ticks run per frame when rendering lags
+INTERPOLATE_RENDER = False     # draw moving objects between ticks
+MAX_PARTICLES = 400
+MAX_FLOATS = 48
+MAZE_SIZE = (21, 11)
+LONG_SENTENCE = 660            # sentence (wanted 3+) that earns the big maze, set at arrest
+LONG_SENTENCE_MAZE = (121, 61)
+KEY_BAND = (0.3, 0.8)          # keys sit this far along the farthest path from the start
+LONG_SENTENCE_KEY_BAND = (0.6, 1.0)
+MAZE_POOL_DEPTH = 2            # ready mazes kept per size
+AUTOSAVE_TICKS = 5 * TARGET_FPS
+SAVE_PATH = Path.home() / '.life_simulator.sav'
+LEADERBOARD_PATH = Path.home() / '.life_simulator.db'
+LEADERBOARD_SIZE = 3           # entries per list on the game-over screen
+LEADERBOARD_TIMEOUT = 10.0     # seconds a blocking query waits for the worker
+TELEMETRY_BUFFER = 4096        # events held in memory between flushes
+TELEMETRY_FLUSH = 1.0          # seconds between background flushes
+TELEMETRY_MAX_BYTES = 16 * 1024 * 1024  # rotate the event log past this size
+TELEMETRY_KEEP = 5             # rotated logs kept (events.jsonl.1 ... .5)
+KEYFRAME_TICKS = 10 * TARGET_FPS  # replay seek granularity
+KEYFRAME_GROUP = 16            # one full keyframe, then deltas against the previous one
+MAX_KEYFRAMES = 256            # beyond this, keep every other keyframe
+SERVER_FPS = 15                # frames streamed per second (the game still ticks at TARGET_FPS)
+SERVER_MAX_SESSIONS = 500
+SESSION_BACKLOG = 64 * 1024    # unsent bytes before a slow client starts dropping frames
+SPECTATOR_KEYFRAME = 2 * TARGET_FPS  # frames between full repaints sent to spectators
+SPECTATOR_START_TIMEOUT = 5.0   # seconds to wait for the spectator socket to open
+
+# ═══════════════════════════════════════════════════════════════════════════
+# INPUT EVENTS
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Game logic only sees abstract events: one of the named actions below or a
+# single printable character. Only the terminal front-end knows curses keys.
+EV_UP = 'up'
+EV_DOWN = 'down'
+EV_LEFT = 'left'
+EV_RIGHT = 'right'
+EV_BACKSPACE = 'backspace'
+EV_PROFILER = 'profiler'        # front-end only, never reaches the simulation
+
+KEY_EVENTS = {
+    curses.KEY_UP: EV_UP,
+    curses.KEY_DOWN: EV_DOWN,
+    curses.KEY_LEFT: EV_LEFT,
+    curses.KEY_RIGHT: EV_RIGHT,
+    curses.KEY_BACKSPACE: EV_BACKSPACE,
+    127: EV_BACKSPACE,
+    8: EV_BACKSPACE,
+    curses.KEY_F3: EV_PROFILER,
+}
+
+# Remote terminals send raw bytes instead: ANSI/VT100 cursor keys (both the
+# normal and the application-mode form) and DEL/BS for backspace.
+ANSI_EVENTS = {
+    b'\x1b[A': EV_UP, b'\x1bOA': EV_UP,
+    b'\x1b[B': EV_DOWN, b'\x1bOB': EV_DOWN,
+    b'\x1b[C': EV_RIGHT, b'\x1bOC': EV_RIGHT,
+    b'\x1b[D': EV_LEFT, b'\x1bOD': EV_LEFT,
+    b'\x7f': EV_BACKSPACE, b'\x08': EV_BACKSPACE,
+}
+
+
+ESCAPE_MAX = 32                 # longest escape sequence kept waiting for its end
+
+
+def decode_keys(data: bytes) -> Tuple[List[str], bytes]:
+    """Split raw terminal input into events; returns (events, unfinished tail).
+
+    Only ESC [ (CSI, up to its final byte) and ESC O (SS3, one more byte)
+    start a sequence. Any other ESC is a key of its own; like unknown keys in
+    the curses front-end it produces no event, and the byte after it is read
+    normally.
+    """
+    events = []
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte == 0x1b:
+            if i + 1 == len(data):
+                return events, data[i:]     # ESC alone so far: wait for the next byte
+            if data[i + 1] == 0x5b:         # CSI: parameters, then a final byte 0x40-0x7e
+                end = i + 2
+                while end < len(data) and not 0x40 <= data[end] <= 0x7e:
+                    end += 1
+                if end == len(data):
+                    if end - i < ESCAPE_MAX:
+                        return events, data[i:]
+                    i = end                 # runaway sequence: drop it
+                    continue
+                end += 1
+            elif data[i + 1] == 0x4f:       # SS3: exactly one more byte
+                if i + 2 == len(data):
+                    return events, data[i:]
+                end = i + 3
+            else:
+                i += 1                      # lone ESC
+                continue
+            event = ANSI_EVENTS.get(data[i:end])
+            if event:
+                events.append(event)
+            i = end
+            continue
+        event = ANSI_EVENTS.get(data[i:i + 1])
+        if event:
+            events.append(event)
+        elif 32 <= byte <= 126:
+            events.append(chr(byte))
+        i += 1
+    return events, b''
+
+
+MOVE_EVENTS = {
+    EV_UP: (0, -1), 'w': (0, -1), 'W': (0, -1),
+    EV_DOWN: (0, 1), 's': (0, 1), 'S': (0, 1),
+    EV_LEFT: (-1, 0), 'a': (-1, 0), 'A': (-1, 0),
+    EV_RIGHT: (1, 0), 'd': (1, 0), 'D': (1, 0),
+}
+
+# ═══════════════════════════════════════════════════════════════════════════
+# DISPLAY WIDTH
+# ═══════════════════════════════════════════════════════════════════════════
+
+@lru_cache(maxsize=1024)
+def char_width(ch: str) -> int:
+    """Terminal columns taken by one code point (wcwidth rules, like curses)"""
+    if unicodedata.combining(ch) or ch in '\u200d\ufe0e\ufe0f':
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in 'WF' else 1
+
+
+@lru_cache(maxsize=4096)
+def text_width(text: str) -> int:
+    """Terminal columns taken by `text`: emoji and CJK count two, marks zero"""
+    if text.isascii():
+        return len(text)
+    return sum(map(char_width, text))
+
+
+def text_cells(text: str) -> List[str]:
+    """`text` split into terminal cells, as FrameBuffer stores them: a wide
+    glyph is followed by an empty cell, zero-width marks join their glyph"""
+    cells = []
+    for ch in text:
+        w = char_width(ch)
+        if w == 0:
+            if cells:
+                cells[-1 if cells[-1] else -2] += ch
+            continue
+        cells.append(ch)
+        if w == 2:
+            cells.append('')
+    return cells
+
+
+def clip_text(text: str, skip: int, cols: int) -> str:
+    """Columns `skip` to `skip + cols` of `text`.
+
+    A wide glyph cut by either edge leaves spaces for the half inside, so the
+    result is exactly as wide as the cells it covers.
+    """
+    if text.isascii():
+        return text[skip:skip + max(cols, 0)]
+    end = skip + cols
+    out, x, kept = [], 0, False
+    for ch in text:
+        w = char_width(ch)
+        if w == 0:
+            if kept:
+                out.append(ch)
+            continue
+        if x >= end:
+            break
+        kept = skip <= x and x + w <= end
+        if kept:
+            out.append(ch)
+        elif x + w > skip:
+            out.append(' ' * (min(x + w, end) - max(x, skip)))
+        x += w
+    return ''.join(out)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # ZONES WITH ENHANCED VISUALS
@@ -187,6 +391,73 @@ ZONE_DATA = {
     },
 }
 
+# Widest line of each zone's building, in cells, for centering
+for _data in ZONE_DATA.values():
+    _data['building_width'] = max(map(text_width, _data.get('building', [])), default=0)
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ENTITY KINDS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _kind_behaviour(text: str) -> str:
+    if '💰 CRIME' in text:
+        return 'crime'
+    if '🔑 KEY' in text:
+        return 'key'
+    if 'POLICE' in text:
+        return 'police'
+    if 'COFFEE' in text or '☕' in text:
+        return 'coffee'
+    if 'PARTY' in text or '🎉' in text:
+        return 'party'
+    return ''
+
+
+class EntityKind:
+    """One falling item type, compiled once from the zone pools.
+
+    Entities only carry the kind id; the behaviour tag, hitbox width and the
+    bracketed render string are worked out here instead of on every spawn,
+    hit and frame.
+    """
+    __slots__ = ('id', 'text', 'effect', 'is_good', 'behaviour', 'width', 'label')
+    
+    def __init__(self, kind_id: int, text: str, effect: int):
+        self.id = kind_id
+        self.text = text
+        self.effect = effect
+        self.is_good = effect >= 0
+        self.behaviour = _kind_behaviour(text)
+        self.width = len(text) + 4
+        self.label = f"✧ {text} ✧" if self.is_good else f"[{text}]"
+
+
+ENTITY_KINDS: List[EntityKind] = []
+_KIND_IDS: Dict[Tuple[str, int], int] = {}
+
+
+def entity_kind(text: str, effect: int) -> int:
+    """Interned id of the (text, effect) kind, added to the table if new"""
+    kind_id = _KIND_IDS.get((text, effect))
+    if kind_id is None:
+        kind_id = _KIND_IDS[text, effect] = len(ENTITY_KINDS)
+        ENTITY_KINDS.append(EntityKind(kind_id, text, effect))
+    return kind_id
+
+
+CRIME_KIND = entity_kind('💰 CRIME', 0)
+
+# Spawn pools as tuples of kind ids. Every pool is uniformly weighted, so a
+# draw is a single index (rng.choice), the same RNG use as before.
+ZONE_KINDS = {
+    zone: {
+        'good': tuple(entity_kind(text, effect) for text, effect in data['good']),
+        'bad': tuple(entity_kind(text, effect) for text, effect in data['bad']),
+        'special': entity_kind(*data['special']) if 'special' in data else CRIME_KIND,
+    }
+    for zone, data in ZONE_DATA.items()
+}
+
 # ═══════════════════════════════════════════════════════════════════════════
 # BOSS TYPES WITH BETTER ART
 # ═══════════════════════════════════════════════════════════════════════════
@@ -259,6 +530,9 @@ BOSSES = {
     },
 }
 
+for _data in BOSSES.values():
+    _data['width'] = max(map(text_width, _data['art']))
+
 # ═══════════════════════════════════════════════════════════════════════════
 # ENHANCED PLAYER SPRITES
 # ═══════════════════════════════════════════════════════════════════════════
@@ -298,16 +572,19 @@ TYPING_WORDS = {
 # ═══════════════════════════════════════════════════════════════════════════
 
 class Entity:
-    def __init__(self, x: float, y: float, text: str, is_good: bool, effect: int):
+    def __init__(self, x: float, y: float, kind: int, wave: float = 0.0, glow_phase: float = 0.0):
+        info = ENTITY_KINDS[kind]
         self.x = x
         self.y = y
-        self.text = text
-        self.is_good = is_good
-        self.effect = effect
-        self.width = len(text) + 4
+        self.kind = kind
+        self.is_good = info.is_good
+        self.effect = info.effect
+        self.width = info.width
         self.speed = 0.3
-        self.wave = random.uniform(0, 6.28)
-        self.glow_phase = random.uniform(0, 6.28)
+        self.wave = wave
+        self.glow_phase = glow_phase
+        self.seq = 0
+        self.row = None
     
     def update(self, slow_mo: bool = False):
         speed = self.speed * 0.4 if slow_mo else self.speed
@@ -316,19 +593,208 @@ class Entity:
         self.glow_phase += 0.2
         if self.is_good:
             self.x += math.sin(self.wave) * 0.4
+    
+    @property
+    def text(self) -> str:
+        return ENTITY_KINDS[self.kind].text
+
+
+class EntityStore:
+    """Struct-of-arrays entity container backed by NumPy.
+
+    Stands in for the `state.entities` list (append/clear/iter/len) but keeps
+    every field in a parallel array, so movement, wobble, off-screen culling
+    and the AABB test against the player run as whole-array operations.
+    """
+    def __init__(self, capacity: int = 256):
+        if np is None:
+            raise ImportError("EntityStore requires numpy (pip install numpy)")
+        self.size = 0
+        self.generation = 0
+        self._alloc(capacity)
+    
+    def _alloc(self, capacity: int):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.wave = np.zeros(capacity)
+        self.glow_phase = np.zeros(capacity)
+        self.width = np.zeros(capacity, dtype=np.int32)
+        self.is_good = np.zeros(capacity, dtype=bool)
+        self.effect = np.zeros(capacity, dtype=np.int32)
+        self.kind = np.zeros(capacity, dtype=np.int16)
+        self._tmp = np.zeros(capacity)
+    
+    def _arrays(self):
+        return (self.x, self.y, self.speed, self.wave, self.glow_phase,
+                self.width, self.is_good, self.effect, self.kind)
+    
+    def _grow(self):
+        old, n = self._arrays(), self.size
+        self._alloc(self.capacity * 2)
+        for dst, src in zip(self._arrays(), old):
+            dst[:n] = src[:n]
+    
+    def append(self, e: Entity):
+        if self.size == self.capacity:
+            self._grow()
+        i = self.size
+        self.x[i] = e.x
+        self.y[i] = e.y
+        self.speed[i] = e.speed
+        self.wave[i] = e.wave
+        self.glow_phase[i] = e.glow_phase
+        self.width[i] = e.width
+        self.is_good[i] = e.is_good
+        self.effect[i] = e.effect
+        self.kind[i] = e.kind
+        self.size += 1
+    
+    def clear(self):
+        self.size = 0
+        self.generation += 1
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __getitem__(self, i: int) -> Entity:
+        """Materialize entity `i` as a plain Entity (a copy, not a view)"""
+        e = Entity.__new__(Entity)
+        e.x = float(self.x[i])
+        e.y = float(self.y[i])
+        e.kind = int(self.kind[i])
+        e.is_good = bool(self.is_good[i])
+        e.effect = int(self.effect[i])
+        e.width = int(self.width[i])
+        e.speed = float(self.speed[i])
+        e.wave = float(self.wave[i])
+        e.glow_phase = float(self.glow_phase[i])
+        return e
+    
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+    
+    def _compact(self, keep):
+        m = int(np.count_nonzero(keep))
+        for arr in self._arrays():
+            arr[:m] = arr[:self.size][keep]
+        self.size = m
+    
+    def step(self, state: 'GameState', player: 'Player'):
+        """Move, collide and cull every entity for one frame"""
+        n = self.size
+        if n == 0:
+            return
+        x, y, good = self.x[:n], self.y[:n], self.is_good[:n]
+        
+        y += self.speed[:n] * 0.4 if player.coffee > 0 else self.speed[:n]
+        self.wave[:n] += 0.15
+        self.glow_phase[:n] += 0.2
+        wobble = np.sin(self.wave[:n], out=self._tmp[:n])
+        wobble *= 0.4
+        x += np.where(good, wobble, 0.0)
+        if state.profiler:
+            state.profiler.lap('u.move')
+        
+        off = y > state.height
+        if player.invincible == 0:
+            hit = ((player.x < x + self.width[:n]) & (player.x + 6 > x) &
+                   (player.y < y + 1) & (player.y + 3 > y - 1))
+        else:
+            hit = np.zeros(n, dtype=bool)
+        
+        # Collisions resolve in spawn order, exactly like the per-object loop:
+        # a bad hit makes the player invincible for the rest of the frame, and
+        # an arrest clears the whole store.
+        escaped = off & ~good
+        taken = np.zeros(n, dtype=bool)
+        generation = self.generation
+        for i in np.flatnonzero(hit):
+            if player.invincible > 0:
+                break
+            taken[i] = True
+            handle_collision(state, player, self[i])
+            if self.generation != generation:
+                player.score += 5 * int(np.count_nonzero(escaped[:i] & ~taken[:i]))
+                if state.profiler:
+                    state.profiler.lap('u.collide')
+                return
+        
+        player.score += 5 * int(np.count_nonzero(escaped & ~taken))
+        remove = off | taken
+        if remove.any():
+            self._compact(~remove)
+        if state.profiler:
+            state.profiler.lap('u.collide')
+
+
+class RowGrid:
+    """Row-bucketed spatial index over the entity list.
+
+    Each bucket covers `band` screen rows. An entity only moves between
+    buckets when it falls into the next band, and collision queries touch
+    just the buckets overlapping the player's box.
+    """
+    def __init__(self, band: int = 4):
+        self.band = band
+        self.rows: Dict[int, Dict[Entity, None]] = {}
+        self.generation = 0
+    
+    def insert(self, e: Entity):
+        e.row = math.floor(e.y / self.band)
+        self.rows.setdefault(e.row, {})[e] = None
+    
+    def discard(self, e: Entity):
+        if e.row is not None:
+            bucket = self.rows[e.row]
+            del bucket[e]
+            if not bucket:
+                del self.rows[e.row]
+            e.row = None
+    
+    def move(self, e: Entity):
+        row = math.floor(e.y / self.band)
+        if row != e.row:
+            self.discard(e)
+            e.row = row
+            self.rows.setdefault(row, {})[e] = None
+    
+    def query(self, top: float, bottom: float) -> List[Entity]:
+        """Entities in the buckets overlapping rows [top, bottom], in spawn order"""
+        found = []
+        for row in range(math.floor(top / self.band), math.floor(bottom / self.band) + 1):
+            bucket = self.rows.get(row)
+            if bucket:
+                found.extend(bucket)
+        found.sort(key=lambda e: e.seq)
+        return found
+    
+    def clear(self):
+        self.rows.clear()
+        self.generation += 1
 
 
 class Particle:
-    def __init__(self, x: float, y: float, char: str, color: int):
+    __slots__ = ('x', 'y', 'char', 'color', 'vx', 'vy', 'life', 'max_life')
+    
+    def __init__(self):
+        self.x = self.y = self.vx = self.vy = 0.0
+        self.char = ' '
+        self.color = 0
+        self.life = self.max_life = 0
+    
+    def spawn(self, x: float, y: float, char: str, color: int, rng: random.Random):
         self.x = x
         self.y = y
         self.char = char
         self.color = color
-        angle = random.uniform(0, 6.28)
-        speed = random.uniform(0.5, 1.5)
+        angle = rng.uniform(0, 6.28)
+        speed = rng.uniform(0.5, 1.5)
         self.vx = math.cos(angle) * speed
         self.vy = math.sin(angle) * speed - 0.8
-        self.life = random.randint(15, 35)
+        self.life = rng.randint(15, 35)
         self.max_life = self.life
     
     def update(self):
@@ -340,7 +806,16 @@ class Particle:
 
 
 class FloatText:
-    def __init__(self, x: int, y: float, text: str, color: int):
+    __slots__ = ('x', 'y', 'text', 'color', 'life', 'max_life')
+    
+    def __init__(self):
+        self.x = 0
+        self.y = 0.0
+        self.text = ''
+        self.color = 0
+        self.life = self.max_life = 0
+    
+    def spawn(self, x: int, y: float, text: str, color: int):
         self.x = x
         self.y = y
         self.text = text
@@ -353,6 +828,57 @@ class FloatText:
         self.life -= 1
 
 
+class Pool:
+    """Fixed-capacity ring of reusable Particle/FloatText slots.
+
+    Live items occupy a contiguous window starting at `head`, oldest first.
+    Emitting into a full pool recycles the oldest item, and `update` compacts
+    the survivors in place by swapping slots, so steady-state play allocates
+    nothing.
+    """
+    def __init__(self, factory, capacity: int):
+        self.slots = [factory() for _ in range(capacity)]
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+    
+    def emit(self):
+        """Claim the next slot, evicting the oldest item when full"""
+        if self.count == self.capacity:
+            item = self.slots[self.head]
+            self.head = (self.head + 1) % self.capacity
+            return item
+        item = self.slots[(self.head + self.count) % self.capacity]
+        self.count += 1
+        return item
+    
+    def update(self):
+        slots, cap, head = self.slots, self.capacity, self.head
+        alive = 0
+        for k in range(self.count):
+            i = (head + k) % cap
+            item = slots[i]
+            item.update()
+            if item.life > 0:
+                if alive != k:
+                    j = (head + alive) % cap
+                    slots[i], slots[j] = slots[j], item
+                alive += 1
+        self.count = alive
+    
+    def clear(self):
+        self.head = 0
+        self.count = 0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __iter__(self):
+        slots, cap, head = self.slots, self.capacity, self.head
+        for k in range(self.count):
+            yield slots[(head + k) % cap]
+
+
 class Boss:
     def __init__(self, zone: Zone, x: int, y: int):
         data = BOSSES.get(zone, BOSSES[Zone.WORK])
@@ -371,9 +897,9 @@ class Boss:
 
 class TypingChallenge:
     """Fixed typing challenge with better input handling"""
-    def __init__(self, zone: Zone):
+    def __init__(self, zone: Zone, rng: random.Random = random):
         words = TYPING_WORDS.get(zone, TYPING_WORDS[Zone.WORK])
-        self.word = random.choice(words).lower()
+        self.word = rng.choice(words).lower()
         self.typed = ""
         self.timer = 10.0
         self.max_timer = 10.0
@@ -381,20 +907,20 @@ class TypingChallenge:
         self.success = False
         self.cursor_blink = 0
     
-    def handle_key(self, key: int) -> Tuple[bool, str]:
-        """Handle a keypress. Returns (handled, message)"""
+    def handle_key(self, event: str) -> Tuple[bool, str]:
+        """Handle an input event. Returns (handled, message)"""
         if not self.active:
             return False, ""
         
         # Backspace
-        if key in (curses.KEY_BACKSPACE, 127, 8):
+        if event == EV_BACKSPACE:
             if self.typed:
                 self.typed = self.typed[:-1]
             return True, ""
         
         # Regular character
-        if 32 <= key <= 126:
-            char = chr(key).lower()
+        if len(event) == 1:
+            char = event.lower()
             target_idx = len(self.typed)
             
             if target_idx < len(self.word):
@@ -421,46 +947,213 @@ class TypingChallenge:
 
 
 class MazeGame:
-    """Simple maze for prison escape"""
-    def __init__(self, width: int = 21, height: int = 11):
+    """Prison escape maze.
+
+    Cells live in a flat bytearray indexed `y * width + x`, so a 1001x1001
+    maze is one megabyte instead of a million-element list of lists.
+    The carve is a spanning tree: `from_start` holds each cell's depth in it
+    and `enter`/`leave` its subtree as a preorder interval. One step along a
+    corridor moves the player one closer to every target on that side of the
+    edge and one farther from the rest, so `move` keeps the exit and key
+    distances the HUD shows up to date in O(1), with no search per step.
+    `row_cache` holds rows already rendered by `render_maze`, each tagged
+    with the exit tile it was drawn with. Cells are written through
+    `set_cell`, which drops the cell's row.
+    """
+    WALL, PATH, START, EXIT, KEY = range(5)
+    # Every ordering of the four carving directions; one is drawn per cell
+    ORDERS = [(a, b, c, d) for a in range(4) for b in range(4) for c in range(4)
+              for d in range(4) if len({a, b, c, d}) == 4]
+    
+    def __init__(self, width: int = 21, height: int = 11, rng: random.Random = random,
+                 key_band: Tuple[float, float] = KEY_BAND):
         self.width = width
         self.height = height
-        self.maze = self._generate()
+        self.exit = (height - 2) * width + width - 2
+        self.from_start = array('i', [-1]) * (width * height)
+        self.enter = array('i', [0]) * (width * height)
+        self.leave = array('i', [0]) * (width * height)
+        self.maze = self._generate(rng)
+        self.key_cells = self._place_keys(rng, key_band)
+        self.row_cache: Dict[int, tuple] = {}
         self.player_x = 1
         self.player_y = 1
+        self.track()
         self.keys = 0
         self.active = True
         self.escaped = False
         self.move_cooldown = 0
     
-    def _generate(self) -> List[List[int]]:
-        """Generate maze using recursive backtracking"""
-        maze = [[0] * self.width for _ in range(self.height)]
+    def _generate(self, rng: random.Random) -> bytearray:
+        """Depth-first backtracking with an explicit stack (no recursion limit)"""
+        w, h = self.width, self.height
+        maze = bytearray(w * h)
+        # Carvable cells sit on odd coordinates strictly inside the border.
+        # The padding and the zero border columns make every two-step jump
+        # that leaves the maze land on a 0, so no bounds checks are needed.
+        todo = bytearray(w * h + 2 * w)
+        for y in range(1, h - 1, 2):
+            todo[y * w + 1:y * w + w - 1:2] = b'\x01' * len(range(1, w - 1, 2))
+        steps = (-2 * w, 2 * w, -2, 2)
+        orders = [tuple(steps[i] for i in order) for order in self.ORDERS]
+        rand = rng.random
         
-        def carve(x, y):
-            maze[y][x] = 1
-            dirs = [(0, -2), (0, 2), (-2, 0), (2, 0)]
-            random.shuffle(dirs)
-            for dx, dy in dirs:
-                nx, ny = x + dx, y + dy
-                if 0 < nx < self.width - 1 and 0 < ny < self.height - 1:
-                    if maze[ny][nx] == 0:
-                        maze[y + dy//2][x + dx//2] = 1
-                        carve(nx, ny)
+        # The carve is a spanning tree, so each cell's depth in it is its exact
+        # walking distance from the start. Cells are numbered in carve order
+        # (`enter`) and a cell's subtree ends where numbering stood when it
+        # was backtracked (`leave`); a corridor cell shares its room's subtree.
+        dist, enter, leave = self.from_start, self.enter, self.leave
+        start = w + 1
+        todo[start] = 0
+        maze[start] = self.PATH
+        dist[start] = 0
+        count = 1
+        cells = [start]
+        pending = [iter(orders[int(rand() * 24)])]
+        while cells:
+            cell = cells[-1]
+            for step in pending[-1]:
+                nxt = cell + step
+                if todo[nxt]:
+                    todo[nxt] = 0
+                    mid = cell + step // 2
+                    maze[mid] = maze[nxt] = self.PATH
+                    depth = dist[cell]
+                    dist[mid] = depth + 1
+                    dist[nxt] = depth + 2
+                    enter[mid] = count
+                    enter[nxt] = count + 1
+                    count += 2
+                    cells.append(nxt)
+                    pending.append(iter(orders[int(rand() * 24)]))
+                    break
+            else:
+                cells.pop()
+                pending.pop()
+                leave[cell] = count
+                if cells:
+                    leave[(cell + cells[-1]) // 2] = count
+        
+        maze[start] = self.START
+        maze[self.exit] = self.EXIT
+        return maze
+    
+    def _index(self):
+        """Rebuild `from_start`, `enter` and `leave` from the cells (after a load)"""
+        maze, w = self.maze, self.width
+        steps = (-w, -1, 1, w)
+        dist = self.from_start = array('i', [-1]) * len(maze)
+        enter = self.enter = array('i', [0]) * len(maze)
+        leave = self.leave = array('i', [0]) * len(maze)
+        start = w + 1
+        dist[start] = 0
+        count = 1
+        cells = [start]
+        pending = [iter(steps)]
+        while cells:
+            cell = cells[-1]
+            # The border is solid wall, so neighbours never leave the grid
+            for step in pending[-1]:
+                nxt = cell + step
+                if maze[nxt] and dist[nxt] < 0:
+                    dist[nxt] = dist[cell] + 1
+                    enter[nxt] = count
+                    count += 1
+                    cells.append(nxt)
+                    pending.append(iter(steps))
+                    break
+            else:
+                cells.pop()
+                pending.pop()
+                leave[cell] = count
+    
+    def distance(self, a: int, b: int) -> int:
+        """Walking steps between open cells `a` and `b`.
+
+        Climbs from `a` to the first cell whose subtree holds `b`; the path
+        turns there. Costs one step per cell climbed.
+        """
+        maze, w, depth, enter, leave = self.maze, self.width, self.from_start, self.enter, self.leave
+        top, target = a, enter[b]
+        while not enter[top] <= target < leave[top]:
+            up = depth[top] - 1
+            for nxt in (top - w, top - 1, top + 1, top + w):
+                if maze[nxt] and depth[nxt] == up:
+                    top = nxt
+                    break
+        return depth[a] + depth[b] - 2 * depth[top]
+    
+    def track(self):
+        """Measure the exit and key distances from where the player stands"""
+        here = self.player_y * self.width + self.player_x
+        self.to_exit = self.distance(here, self.exit)
+        self.to_keys = {i: self.distance(here, i) for i in self.key_cells}
+    
+    def _step(self, here: int, there: int):
+        """Update the tracked distances for a move across one corridor edge"""
+        enter, leave = self.enter, self.leave
+        down = self.from_start[there] > self.from_start[here]
+        below = there if down else here
+        lo, hi = enter[below], leave[below]
         
-        carve(1, 1)
-        maze[1][1] = 2  # Start
-        maze[self.height - 2][self.width - 2] = 3  # Exit
+        def delta(target: int) -> int:
+            # Targets below the edge get closer going down, farther going up
+            return -1 if (lo <= enter[target] < hi) == down else 1
         
-        # Place keys
-        paths = [(x, y) for y in range(self.height) for x in range(self.width)
-                 if maze[y][x] == 1]
-        random.shuffle(paths)
-        for i in range(min(3, len(paths))):
-            x, y = paths[i]
-            maze[y][x] = 4
+        self.to_exit += delta(self.exit)
+        for i in self.to_keys:
+            self.to_keys[i] += delta(i)
+    
+    def _place_keys(self, rng: random.Random, band: Tuple[float, float]) -> List[int]:
+        """Pick 3 key cells whose distance from the start lies in `band`.
+
+        The band is a fraction of the farthest reachable distance. Cells within
+        half its lower edge of the exit are skipped too, so no key sits next to
+        either end. Cells are drawn at random until three fit, which on big
+        mazes is far cheaper than listing every candidate; small or unlucky
+        mazes fall back to the full list, then to any open cell.
+        """
+        maze, from_start, exit = self.maze, self.from_start, self.exit
+        far = max(from_start)
+        lo, hi = int(band[0] * far), int(band[1] * far)
+        near = max(1, lo // 2)
         
-        return maze
+        def fits(i: int) -> bool:
+            if maze[i] != self.PATH or not lo <= from_start[i] <= hi:
+                return False
+            # The depth difference is a lower bound; climb only when it isn't enough
+            return (abs(from_start[i] - from_start[exit]) >= near
+                    or self.distance(i, exit) >= near)
+        
+        keys: List[int] = []
+        for _ in range(64 * 3):
+            i = rng.randrange(len(maze))
+            if fits(i) and i not in keys:
+                keys.append(i)
+                if len(keys) == 3:
+                    break
+        else:
+            candidates = [i for i in range(len(maze)) if fits(i)]
+            if len(candidates) < 3:
+                candidates = [i for i, cell in enumerate(maze) if cell == self.PATH]
+            keys = rng.sample(candidates, min(3, len(candidates)))
+        for i in keys:
+            maze[i] = self.KEY
+        return keys
+    
+    def cell(self, x: int, y: int) -> int:
+        return self.maze[y * self.width + x]
+    
+    def set_cell(self, i: int, cell: int):
+        self.maze[i] = cell
+        self.row_cache.pop(i // self.width, None)
+    
+    def exit_distance(self) -> int:
+        return self.to_exit
+    
+    def key_distance(self) -> int:
+        """Steps to the nearest remaining key, -1 once all are collected"""
+        return min(self.to_keys.values(), default=-1)
     
     def move(self, dx: int, dy: int) -> str:
         if self.move_cooldown > 0:
@@ -468,17 +1161,21 @@ class MazeGame:
         
         nx, ny = self.player_x + dx, self.player_y + dy
         if 0 <= nx < self.width and 0 <= ny < self.height:
-            cell = self.maze[ny][nx]
-            if cell != 0:
+            cell = self.maze[ny * self.width + nx]
+            if cell != self.WALL:
+                self._step(self.player_y * self.width + self.player_x, ny * self.width + nx)
                 self.player_x = nx
                 self.player_y = ny
                 self.move_cooldown = 3
                 
-                if cell == 4:
-                    self.maze[ny][nx] = 1
+                if cell == self.KEY:
+                    i = ny * self.width + nx
+                    self.set_cell(i, self.PATH)
+                    self.key_cells.remove(i)
+                    del self.to_keys[i]
                     self.keys += 1
                     return f"🔑 KEY {self.keys}/3!"
-                elif cell == 3:
+                elif cell == self.EXIT:
                     if self.keys >= 3:
                         self.escaped = True
                         self.active = False
@@ -491,6 +1188,89 @@ class MazeGame:
             self.move_cooldown -= 1
 
 
+MAZE_SPEC = (*MAZE_SIZE, KEY_BAND)
+LONG_SENTENCE_SPEC = (*LONG_SENTENCE_MAZE, LONG_SENTENCE_KEY_BAND)
+
+
+class MazePool:
+    """Mazes generated ahead of time so start_maze never builds one mid-frame.
+
+    The n-th maze of each spec (width, height, key band) always comes from
+    the same seed, derived from the game seed, so a hit and a miss hand out
+    identical mazes and replays stay deterministic. Until `start()` is called
+    there is no worker and every take is a miss built on the spot, which is
+    what headless runs want.
+    """
+    def __init__(self, seed: int, specs=(MAZE_SPEC, LONG_SENTENCE_SPEC),
+                 depth: int = MAZE_POOL_DEPTH):
+        self.seed = seed
+        self.depth = depth
+        self.ready: Dict[tuple, deque] = {spec: deque() for spec in specs}
+        self.taken = {spec: 0 for spec in specs}
+        self.queued = {spec: 0 for spec in specs}
+        self.hits = 0
+        self.misses = 0
+        self.cond = threading.Condition()
+        self.worker: Optional[threading.Thread] = None
+        self.stopping = False
+    
+    def build(self, spec: tuple, n: int) -> MazeGame:
+        width, height, band = spec
+        rng = random.Random(f"maze:{self.seed}:{width}x{height}:{n}")
+        return MazeGame(width, height, rng, band)
+    
+    def take(self, spec: tuple) -> MazeGame:
+        with self.cond:
+            n = self.taken[spec]
+            self.taken[spec] = n + 1
+            ready = self.ready[spec]
+            if ready and ready[0][0] == n:
+                self.hits += 1
+                self.cond.notify()
+                return ready.popleft()[1]
+            self.misses += 1
+        return self.build(spec, n)
+    
+    def start(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._fill, name='maze-pool', daemon=True)
+            self.worker.start()
+    
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        if self.worker:
+            self.worker.join()
+            self.worker = None
+    
+    def _next_job(self) -> Optional[Tuple[tuple, int]]:
+        for spec, ready in self.ready.items():
+            # Misses move past numbers the worker was about to build
+            while ready and ready[0][0] < self.taken[spec]:
+                ready.popleft()
+            self.queued[spec] = max(self.queued[spec], self.taken[spec])
+            if len(ready) < self.depth:
+                return spec, self.queued[spec]
+        return None
+    
+    def _fill(self):
+        while True:
+            with self.cond:
+                job = self._next_job()
+                while job is None and not self.stopping:
+                    self.cond.wait()
+                    job = self._next_job()
+                if self.stopping:
+                    return
+            spec, n = job
+            maze = self.build(spec, n)
+            with self.cond:
+                if n >= self.taken[spec] and n == self.queued[spec]:
+                    self.ready[spec].append((n, maze))
+                    self.queued[spec] = n + 1
+
+
 class Player:
     def __init__(self, x: float, y: int):
         self.x = x
@@ -515,8 +1295,10 @@ class Player:
         self.crimes = 0
         self.arrests = 0
         self.prison_time = 0
+        self.long_sentence = False
         self.keys = 0
         
+        self.bosses_fought = 0
         self.bosses_defeated = 0
         self.tasks_completed = 0
         
@@ -525,23 +1307,37 @@ class Player:
 
 
 class GameState:
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, entity_arrays: bool = False,
+                 max_particles: int = MAX_PARTICLES, max_floats: int = MAX_FLOATS,
+                 seed: Optional[int] = None):
+        # All gameplay randomness comes from `rng`, so a seed plus the input
+        # stream reproduces a run exactly. Purely cosmetic randomness (sparks,
+        # twinkle, shake) draws from `fx` and can never disturb it.
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.fx = random.Random(f"fx:{self.seed}")
+        
         self.width = width
         self.height = height
         self.running = True
         self.paused = False
         self.game_over = False
         self.frame = 0
+        self.tick = 0           # Simulation.ticks of the tick being run; survives restarts
         
         self.zone = Zone.SCHOOL
         self.mode = 'normal'
+        self.zone_ticks: Dict[Zone, int] = {}
         
-        self.entities: List[Entity] = []
-        self.particles: List[Particle] = []
-        self.floats: List[FloatText] = []
+        self.entities: List[Entity] = EntityStore() if entity_arrays else []
+        self.grid = RowGrid()
+        self.spawned = 0
+        self.particles = Pool(Particle, max_particles)
+        self.floats = Pool(FloatText, max_floats)
         
         self.typing: Optional[TypingChallenge] = None
         self.maze: Optional[MazeGame] = None
+        self.mazes = MazePool(self.seed)
         self.boss: Optional[Boss] = None
         
         self.difficulty = 1.0
@@ -553,15 +1349,33 @@ class GameState:
         self.message_color = 2
         
         # Enhanced visuals
-        self.stars = [(random.randint(0, width), random.randint(2, 8), 
-                       random.choice(['★', '✦', '·', '•'])) for _ in range(20)]
-        self.clouds = [(random.randint(0, width), random.randint(1, 4)) for _ in range(5)]
+        fx = self.fx
+        self.stars = [(fx.randint(0, width), fx.randint(2, 8), 
+                       fx.choice(['★', '✦', '·', '•'])) for _ in range(20)]
+        self.clouds = [(fx.randint(0, width), fx.randint(1, 4)) for _ in range(5)]
         self.ground_offset = 0
+        self.background = None
+        self.profiler: Optional['FrameProfiler'] = None
+        self.leaderboard: Optional['Leaderboard'] = None
+        self.run_recorded = False
+        self.telemetry: Optional['Telemetry'] = None
 
 # ═══════════════════════════════════════════════════════════════════════════
 # GAME LOGIC
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Pair attributes are computed from the A_COLOR mask exactly as curses does,
+# so frames can also be rendered off-screen without initscr().
+PAIR_SHIFT = (curses.A_COLOR & -curses.A_COLOR).bit_length() - 1
+
+
+def color_pair(n: int) -> int:
+    return (n << PAIR_SHIFT) & curses.A_COLOR
+
+
+COLOR_PAIRS = 10    # pairs 0-9; init_colors sets up 1-9
+
+
 def init_colors():
     curses.start_color()
     curses.use_default_colors()
@@ -581,7 +1395,7 @@ def get_zone_for_age(age: int) -> Zone:
 
 
 def spawn_entity(state: GameState, player: Player):
-    data = ZONE_DATA[state.zone]
+    kinds = ZONE_KINDS[state.zone]
     
     good_chance = 0.35
     if state.zone == Zone.BEACH:
@@ -591,41 +1405,58 @@ def spawn_entity(state: GameState, player: Player):
     elif state.zone == Zone.STREETS:
         good_chance = 0.25
     
-    is_good = random.random() < good_chance
+    rng = state.rng
+    is_good = rng.random() < good_chance
     
-    pool = data['good'] if is_good else data['bad']
+    pool = kinds['good'] if is_good else kinds['bad']
     if not pool:
-        pool = data['good']
+        pool = kinds['good']
     if not pool:
         return
     
-    text, effect = random.choice(pool)
+    kind = rng.choice(pool)
     
     # Crime opportunity
-    if state.zone == Zone.STREETS and random.random() < 0.08:
-        text, effect = data.get('special', ('💰 CRIME', 0))
+    if state.zone == Zone.STREETS and rng.random() < 0.08:
+        kind = kinds['special']
     
-    width = len(text) + 4
-    max_x = state.width - width - 5
+    max_x = state.width - ENTITY_KINDS[kind].width - 5
     if max_x < 5:
         max_x = 5
-    x = random.randint(5, max_x)
+    x = rng.randint(5, max_x)
     
-    entity = Entity(x, -2, text, is_good or effect >= 0, effect)
+    entity = Entity(x, -2, kind, rng.uniform(0, 6.28), state.fx.uniform(0, 6.28))
     entity.speed = 0.25 + state.difficulty * 0.02
     
+    add_entity(state, entity)
+
+
+def add_entity(state: GameState, entity: Entity):
+    entity.seq = state.spawned
+    state.spawned += 1
     state.entities.append(entity)
+    if not isinstance(state.entities, EntityStore):
+        state.grid.insert(entity)
+
+
+def clear_entities(state: GameState):
+    state.entities.clear()
+    state.grid.clear()
+
+
+GOOD_SPARKS = ('✦', '★', '✧', '◇', '○', '♦')
+BAD_SPARKS = ('!', '×', '✕', '⚡', '☠', '💥')
 
 
 def add_particles(state: GameState, x: float, y: float, good: bool, count: int = 12):
-    chars = ['✦', '★', '✧', '◇', '○', '♦'] if good else ['!', '×', '✕', '⚡', '☠', '💥']
+    chars = GOOD_SPARKS if good else BAD_SPARKS
     color = 6 if good else 1
     for _ in range(count):
-        state.particles.append(Particle(x, y, random.choice(chars), color))
+        state.particles.emit().spawn(x, y, state.fx.choice(chars), color, state.fx)
 
 
 def add_float(state: GameState, x: int, y: float, text: str, color: int):
-    state.floats.append(FloatText(x, y, text, color))
+    state.floats.emit().spawn(x, y, text, color)
 
 
 def set_message(state: GameState, msg: str, duration: int = 90, color: int = 2):
@@ -634,6 +1465,12 @@ def set_message(state: GameState, msg: str, duration: int = 90, color: int = 2):
     state.message_color = color
 
 
+def log_event(state: GameState, player: Player, kind: str, *detail):
+    """Record a gameplay event when telemetry is on (a no-op otherwise)"""
+    if state.telemetry:
+        state.telemetry.emit(state, player, kind, detail)
+
+
 def check_collision(player: Player, entity: Entity) -> bool:
     px1, px2 = player.x, player.x + 6
     ex1, ex2 = entity.x, entity.x + entity.width
@@ -644,25 +1481,30 @@ def check_collision(player: Player, entity: Entity) -> bool:
 
 def handle_collision(state: GameState, player: Player, entity: Entity):
     add_particles(state, entity.x + entity.width // 2, entity.y, entity.is_good)
+    kind = ENTITY_KINDS[entity.kind]
+    behaviour = kind.behaviour
     
     if player.shield > 0 and not entity.is_good:
         add_float(state, int(entity.x), entity.y, "🛡️ BLOCKED!", 4)
+        log_event(state, player, 'collision', 'blocked', kind.text)
         return
     
-    if '💰 CRIME' in entity.text:
+    if behaviour == 'crime':
         player.crimes += 1
         player.wanted = min(5, player.wanted + 1)
         player.score += 200
         set_message(state, f"💰 +$200! WANTED: {'⭐' * player.wanted}", 90, 5)
         player.sprite = 'criminal'
         player.sprite_timer = 45
+        log_event(state, player, 'collision', 'crime', kind.text)
         return
     
-    if '🔑 KEY' in entity.text:
+    if behaviour == 'key':
         player.keys += 1
         add_float(state, int(entity.x), entity.y, f"🔑 {player.keys}/3!", 5)
         if player.keys >= 3:
             set_message(state, "🔑 3 KEYS! Find the exit to escape!", 120, 6)
+        log_event(state, player, 'collision', 'key', kind.text)
         return
     
     if entity.is_good:
@@ -678,19 +1520,20 @@ def handle_collision(state: GameState, player: Player, entity: Entity):
         
         add_float(state, int(entity.x), entity.y, f"+{points}", 6)
         
-        if 'COFFEE' in entity.text or '☕' in entity.text:
+        if behaviour == 'coffee':
             player.coffee = 200
             player.sprite = 'coffee'
-        elif 'PARTY' in entity.text or '🎉' in entity.text:
+        elif behaviour == 'party':
             player.sprite = 'party'
         else:
             player.sprite = 'happy'
         player.sprite_timer = 40
+        log_event(state, player, 'collision', 'good', kind.text, points)
     else:
         player.combo = 0
         damage = abs(entity.effect)
         
-        if 'POLICE' in entity.text and player.wanted >= 2:
+        if behaviour == 'police' and player.wanted >= 2:
             handle_arrest(state, player)
             return
         
@@ -700,40 +1543,50 @@ def handle_collision(state: GameState, player: Player, entity: Entity):
         player.sprite_timer = 25
         state.screen_shake = 12
         add_float(state, int(entity.x), entity.y, f"-{damage}", 1)
+        log_event(state, player, 'collision', 'bad', kind.text, damage)
 
 
 def handle_arrest(state: GameState, player: Player):
     player.arrests += 1
     player.prison_time = 300 + player.wanted * 120
+    player.long_sentence = player.prison_time >= LONG_SENTENCE
     player.wanted = 0
     player.keys = 0
     player.sprite = 'prisoner'
     
     state.zone = Zone.PRISON
-    state.entities.clear()
+    clear_entities(state)
     set_message(state, "👮 ARRESTED! Welcome to prison!", 120, 1)
     state.screen_shake = 25
+    log_event(state, player, 'arrest', player.prison_time)
+    log_event(state, player, 'zone', state.zone.name)
 
 
 def start_typing(state: GameState, player: Player):
     state.mode = 'typing'
-    state.typing = TypingChallenge(state.zone)
+    state.typing = TypingChallenge(state.zone, state.rng)
     set_message(state, f"⌨️ TYPE: {state.typing.word.upper()}", 60, 5)
 
 
 def start_maze(state: GameState, player: Player):
     state.mode = 'maze'
-    state.maze = MazeGame(21, 11)
-    set_message(state, "🔒 ESCAPE! Find 3 🔑 keys!", 120, 5)
+    if player.long_sentence:
+        state.maze = state.mazes.take(LONG_SENTENCE_SPEC)
+        set_message(state, "⛓️ LONG SENTENCE! Find 3 🔑 keys!", 120, 1)
+    else:
+        state.maze = state.mazes.take(MAZE_SPEC)
+        set_message(state, "🔒 ESCAPE! Find 3 🔑 keys!", 120, 5)
 
 
 def start_boss(state: GameState, player: Player):
     if state.zone not in BOSSES:
         return
     state.mode = 'boss'
-    state.boss = Boss(state.zone, (state.width - 44) // 2, 1)
+    state.boss = Boss(state.zone, (state.width - BOSSES[state.zone]['width']) // 2, 1)
+    player.bosses_fought += 1
     set_message(state, f"⚠️ BOSS: {state.boss.name}!", 120, 1)
     state.screen_shake = 20
+    log_event(state, player, 'boss_start', state.boss.name)
 
 
 def update_boss(state: GameState, player: Player):
@@ -753,12 +1606,14 @@ def update_boss(state: GameState, player: Player):
     if boss.attack_timer >= rate:
         boss.attack_timer = 0
         boss.shake = 8
-        data = ZONE_DATA[state.zone]
-        if data['bad']:
-            text, effect = random.choice(data['bad'])
-            e = Entity(random.randint(10, state.width - 25), len(boss.art) + 3, text, False, effect)
+        pool = ZONE_KINDS[state.zone]['bad']
+        if pool:
+            rng = state.rng
+            kind = rng.choice(pool)
+            e = Entity(rng.randint(10, state.width - 25), len(boss.art) + 3, kind,
+                       rng.uniform(0, 6.28), state.fx.uniform(0, 6.28))
             e.speed = 0.35 + boss.phase * 0.08
-            state.entities.append(e)
+            add_entity(state, e)
     
     if boss.shake > 0:
         boss.shake -= 1
@@ -778,6 +1633,7 @@ def update_boss(state: GameState, player: Player):
         set_message(state, f"🎉 {boss.name} DEFEATED! +500!", 120, 6)
         state.screen_shake = 25
         add_particles(state, state.width // 2, 10, True, 25)
+        log_event(state, player, 'boss_defeat', boss.name)
         state.mode = 'normal'
         state.boss = None
         state.boss_cooldown = 900
@@ -797,11 +1653,63 @@ def get_default_sprite(zone: Zone, player: Player) -> str:
     return 'normal'
 
 
+def update_entities(state: GameState, player: Player):
+    if isinstance(state.entities, EntityStore):
+        state.entities.step(state, player)
+        return
+    
+    grid = state.grid
+    band = grid.band
+    slow_mo = player.coffee > 0
+    escaped = []
+    for e in state.entities:
+        e.update(slow_mo)
+        if e.y // band != e.row:
+            grid.move(e)
+        if e.y > state.height:
+            escaped.append(e)
+    prof = state.profiler
+    if prof:
+        prof.lap('u.move')
+    
+    # Only entities in the rows overlapping the player's 6x3 box can collide
+    generation = grid.generation
+    removed = False
+    if player.invincible == 0:
+        for e in grid.query(player.y - 1, player.y + 3):
+            if player.invincible > 0:
+                break
+            if check_collision(player, e):
+                grid.discard(e)
+                removed = True
+                handle_collision(state, player, e)
+                if grid.generation != generation:
+                    # Arrested: the field was cleared mid-frame
+                    player.score += 5 * sum(1 for o in escaped
+                                            if o.seq < e.seq and not o.is_good)
+                    if prof:
+                        prof.lap('u.collide')
+                    return
+    
+    for e in escaped:
+        if e.row is not None:
+            grid.discard(e)
+            removed = True
+            if not e.is_good:
+                player.score += 5
+    
+    if removed:
+        state.entities[:] = [e for e in state.entities if e.row is not None]
+    if prof:
+        prof.lap('u.collide')
+
+
 def update_game(state: GameState, player: Player):
     if state.paused or state.game_over:
         return
     
     state.frame += 1
+    state.zone_ticks[state.zone] = state.zone_ticks.get(state.zone, 0) + 1
     state.ground_offset = (state.ground_offset + 0.5) % 4
     
     # Timers
@@ -856,7 +1764,9 @@ def update_game(state: GameState, player: Player):
             player.prison_time -= 1
         elif player.keys >= 3 or player.prison_time <= 0:
             player.keys = 0
+            player.long_sentence = False
             state.zone = get_zone_for_age(player.age)
+            log_event(state, player, 'zone', state.zone.name)
             set_message(state, "🆓 Released! Back to life!", 120, 6)
             player.sprite = 'happy'
             player.sprite_timer = 60
@@ -870,16 +1780,22 @@ def update_game(state: GameState, player: Player):
             new_zone = get_zone_for_age(player.age)
             if new_zone != state.zone:
                 state.zone = new_zone
-                state.entities.clear()
+                log_event(state, player, 'zone', new_zone.name)
+                clear_entities(state)
                 set_message(state, f"🎂 Age {player.age}! {ZONE_DATA[new_zone]['name']}", 120, 5)
     
     # Beach unlock
-    if player.score >= 5000 and state.zone == Zone.WORK and random.random() < 0.002:
+    if player.score >= 5000 and state.zone == Zone.WORK and state.rng.random() < 0.002:
         state.zone = Zone.BEACH
-        state.entities.clear()
+        log_event(state, player, 'zone', state.zone.name)
+        clear_entities(state)
         set_message(state, "🏖️ VACATION TIME!", 120, 6)
         player.sprite = 'beach'
     
+    prof = state.profiler
+    if prof:
+        prof.lap('u.timers')
+    
     # Boss
     if state.mode == 'boss':
         update_boss(state, player)
@@ -891,7 +1807,7 @@ def update_game(state: GameState, player: Player):
             spawn_entity(state, player)
     
     # Trigger challenges
-    if state.mode == 'normal' and state.challenge_cooldown <= 0 and random.random() < 0.004:
+    if state.mode == 'normal' and state.challenge_cooldown <= 0 and state.rng.random() < 0.004:
         if state.zone == Zone.PRISON:
             start_maze(state, player)
         else:
@@ -904,55 +1820,49 @@ def update_game(state: GameState, player: Player):
             start_boss(state, player)
             state.boss_cooldown = 900
     
-    # Update entities
-    to_remove = []
-    for e in state.entities:
-        e.update(player.coffee > 0)
-        if player.invincible == 0 and check_collision(player, e):
-            to_remove.append(e)
-            handle_collision(state, player, e)
-        elif e.y > state.height:
-            to_remove.append(e)
-            if not e.is_good:
-                player.score += 5
+    if prof:
+        prof.lap('u.spawn')
     
-    for e in to_remove:
-        if e in state.entities:
-            state.entities.remove(e)
-    
-    # Particles
-    for p in state.particles:
-        p.update()
-    state.particles = [p for p in state.particles if p.life > 0]
+    # Update entities
+    update_entities(state, player)
     
-    # Floats
-    for f in state.floats:
-        f.update()
-    state.floats = [f for f in state.floats if f.life > 0]
+    # Particles and floats (pooled, compacted in place)
+    state.particles.update()
+    state.floats.update()
+    if prof:
+        prof.lap('u.particles')
     
     # Game over
     if player.will <= 0:
         state.game_over = True
         player.sprite = 'dead'
+        log_event(state, player, 'game_over')
 
 
-def handle_input(stdscr, state: GameState, player: Player) -> Optional[str]:
-    key = stdscr.getch()
-    
-    if key == -1:
+def key_to_event(key: int) -> Optional[str]:
+    """Translate a curses key code into an abstract input event"""
+    if key in KEY_EVENTS:
+        return KEY_EVENTS[key]
+    if 32 <= key <= 126:
+        return chr(key)
+    return None
+
+
+def apply_input(state: GameState, player: Player, event: Optional[str]) -> Optional[str]:
+    if event is None:
         player.moving_left = False
         player.moving_right = False
         return None
     
-    if key == ord('q') or key == ord('Q'):
+    if event in ('q', 'Q'):
         state.running = False
         return None
     
-    if key == ord('p') or key == ord('P'):
+    if event in ('p', 'P'):
         state.paused = not state.paused
         return None
     
-    if key == ord('r') or key == ord('R') and state.game_over:
+    if event in ('r', 'R') and state.game_over:
         return 'restart'
     
     if state.paused or state.game_over:
@@ -960,11 +1870,12 @@ def handle_input(stdscr, state: GameState, player: Player) -> Optional[str]:
     
     # ═══ TYPING MODE ═══
     if state.mode == 'typing' and state.typing and state.typing.active:
-        handled, result = state.typing.handle_key(key)
+        handled, result = state.typing.handle_key(event)
         if result == "SUCCESS":
             player.score += 150
             player.tasks_completed += 1
             set_message(state, "✅ TASK COMPLETE! +150", 60, 6)
+            log_event(state, player, 'typing_success', state.typing.word)
             add_particles(state, state.width // 2, state.height // 2, True, 15)
             state.mode = 'normal'
             state.typing = None
@@ -974,16 +1885,9 @@ def handle_input(stdscr, state: GameState, player: Player) -> Optional[str]:
     
     # ═══ MAZE MODE ═══
     if state.mode == 'maze' and state.maze and state.maze.active:
-        state.maze.update()
         msg = ""
-        if key == curses.KEY_UP or key == ord('w') or key == ord('W'):
-            msg = state.maze.move(0, -1)
-        elif key == curses.KEY_DOWN or key == ord('s') or key == ord('S'):
-            msg = state.maze.move(0, 1)
-        elif key == curses.KEY_LEFT or key == ord('a') or key == ord('A'):
-            msg = state.maze.move(-1, 0)
-        elif key == curses.KEY_RIGHT or key == ord('d') or key == ord('D'):
-            msg = state.maze.move(1, 0)
+        if event in MOVE_EVENTS:
+            msg = state.maze.move(*MOVE_EVENTS[event])
         
         if msg:
             color = 6 if 'ESCAPED' in msg or 'KEY' in msg else 5
@@ -992,10 +1896,13 @@ def handle_input(stdscr, state: GameState, player: Player) -> Optional[str]:
         if state.maze.escaped:
             player.score += 500
             player.prison_time = 0
+            player.long_sentence = False
             player.keys = 0
             state.mode = 'normal'
             state.maze = None
             state.zone = get_zone_for_age(player.age)
+            log_event(state, player, 'maze_escape')
+            log_event(state, player, 'zone', state.zone.name)
             set_message(state, "🆓 PRISON BREAK! +500!", 120, 6)
             add_particles(state, state.width // 2, state.height // 2, True, 20)
         return None
@@ -1008,151 +1915,1399 @@ def handle_input(stdscr, state: GameState, player: Player) -> Optional[str]:
     player.moving_left = False
     player.moving_right = False
     
-    if key == curses.KEY_LEFT or key == ord('a') or key == ord('A'):
+    dx = MOVE_EVENTS.get(event, (0, 0))[0]
+    if dx < 0:
         player.x = max(1, player.x - speed)
         player.moving_left = True
-    elif key == curses.KEY_RIGHT or key == ord('d') or key == ord('D'):
+    elif dx > 0:
         player.x = min(state.width - 8, player.x + speed)
         player.moving_right = True
     
     return None
 
-# ═══════════════════════════════════════════════════════════════════════════
-# ENHANCED RENDERING
-# ═══════════════════════════════════════════════════════════════════════════
-
-def safe_addstr(stdscr, y, x, text, attr=0):
-    h, w = stdscr.getmaxyx()
-    if y < 0 or y >= h or x >= w:
-        return
-    if x < 0:
-        text = text[-x:]
-        x = 0
-    if x + len(text) > w:
-        text = text[:w - x - 1]
-    if text:
-        try:
-            stdscr.addstr(y, x, text, attr)
-        except:
-            pass
 
+def apply_events(state: GameState, player: Player, events: List[str]) -> Optional[str]:
+    """Apply every event queued since the last tick, in order.
 
-def render_background(stdscr, state: GameState):
-    data = ZONE_DATA[state.zone]
+    Repeats of the same movement (key-repeat bursts) collapse into one move;
+    typed characters are never coalesced.
+    """
+    if not events:
+        return apply_input(state, player, None)
     
-    # Sky elements
-    if state.zone in [Zone.STREETS, Zone.PRISON]:
-        # Night sky with stars
-        for sx, sy, char in state.stars:
-            x = (sx + state.frame // 20) % state.width
-            brightness = curses.A_DIM if random.random() > 0.5 else curses.A_NORMAL
-            safe_addstr(stdscr, sy, x, char, curses.color_pair(5) | brightness)
-    elif state.zone == Zone.BEACH:
-        # Sun and clouds
-        sun_x = (state.frame // 30) % state.width
-        safe_addstr(stdscr, 1, sun_x, "☀️", curses.color_pair(5) | curses.A_BOLD)
-        for cx, cy in state.clouds:
-            x = (cx + state.frame // 40) % state.width
-            safe_addstr(stdscr, cy, x, "☁️", curses.color_pair(7))
-    
-    # Building
-    building = data.get('building', [])
-    if building:
-        bx = (state.width - len(building[0])) // 2
-        for i, line in enumerate(building):
-            color = curses.color_pair(data['color'])
-            safe_addstr(stdscr, 3 + i, bx, line, color)
-    
-    # Ground with scrolling effect
-    ground_y = state.height - 4
-    gc = data['ground_char']
-    pattern = (gc * 3 + '·' + gc * 2 + '·') * 20
-    offset = int(state.ground_offset)
-    ground = pattern[offset:offset + state.width]
-    safe_addstr(stdscr, ground_y, 0, ground, curses.color_pair(data['ground_color']))
+    if state.mode == 'maze' and state.maze and state.maze.active:
+        state.maze.update()
     
-    # Decorations on ground
-    decos = data.get('decorations', [])
-    if decos:
-        for i in range(3):
-            dx = (state.frame // 15 + i * 27) % state.width
-            deco = decos[(i + state.frame // 100) % len(decos)]
-            safe_addstr(stdscr, ground_y - 1, dx, deco, curses.color_pair(data['color']))
+    last = None
+    for event in events:
+        move = MOVE_EVENTS.get(event)
+        if move is not None and move == MOVE_EVENTS.get(last) and state.mode != 'typing':
+            continue
+        last = event
+        if apply_input(state, player, event) == 'restart':
+            return 'restart'
+    return None
 
 
-def render_player(stdscr, player: Player, state: GameState):
-    # Invincibility flashing
-    if player.invincible > 0 and state.frame % 6 < 3:
-        return
+def read_events(stdscr) -> List[str]:
+    """Drain every pending key from the terminal into a list of input events"""
+    events = []
+    while True:
+        key = stdscr.getch()
+        if key == -1:
+            return events
+        event = key_to_event(key)
+        if event is not None:
+            events.append(event)
+
+
+def advance(state: GameState, player: Player):
+    """One frame of simulation after input: challenge timers, then update_game"""
+    # Update typing timer
+    if state.typing and state.typing.active:
+        state.typing.update(FRAME_TIME)
+        if not state.typing.active and not state.typing.success:
+            set_message(state, "⏰ Time's up! Task failed.", 60, 1)
+            log_event(state, player, 'typing_fail', state.typing.word, state.typing.typed)
+            state.mode = 'normal'
+            state.typing = None
     
-    sprite = SPRITES.get(player.sprite, SPRITES['normal'])
+    # Update maze
+    if state.maze:
+        state.maze.update()
     
-    color = curses.color_pair(4)
-    if player.coffee > 0:
-        color = curses.color_pair(5) | curses.A_BOLD
-    if player.rage > 0:
-        color = curses.color_pair(1) | curses.A_BOLD
-    if player.shield > 0:
-        color = curses.color_pair(4) | curses.A_BOLD
+    if not state.game_over:
+        update_game(state, player)
+
+
+class Simulation:
+    """Headless game engine.
+
+    Owns a GameState/Player pair and advances it one tick per call, fed with
+    abstract input events. No terminal, no rendering and no sleeping, so batch
+    runs go as fast as the CPU allows. The curses front-end drives the very
+    same object, one tick per frame.
+    """
+    def __init__(self, width: int = MIN_WIDTH, height: int = MIN_HEIGHT,
+                 entity_arrays: bool = False, seed: Optional[int] = None,
+                 record: bool = False):
+        self.state = GameState(width, height, entity_arrays, seed=seed)
+        self.player = Player(width // 2, height - 7)
+        self.ticks = 0
+        self.recorder = ReplayRecorder(self.state.seed, width, height) if record else None
+        reset_game(self.state, self.player)
     
-    shake_x = random.randint(-1, 1) if state.screen_shake > 0 else 0
-    shake_y = random.randint(-1, 1) if state.screen_shake > 0 else 0
+    def tick(self, events=()) -> Optional[str]:
+        """Apply this tick's input events and advance one frame.
+
+        `events` is a list of events, a single event, or None for no input.
+        """
+        if events is None:
+            events = ()
+        elif isinstance(events, str):
+            events = (events,)
+        prof = self.state.profiler
+        if self.recorder:
+            keyframes = self.recorder.keyframes
+            if keyframes.due(self.ticks):
+                keyframes.add(self.ticks, save_snapshot(self))
+            if events:
+                self.recorder.record(self.ticks, events)
+            if prof:
+                prof.lap('u.replay')
+        self.state.tick = self.ticks
+        self.ticks += 1
+        result = apply_events(self.state, self.player, events)
+        if result == 'restart':
+            reset_game(self.state, self.player)
+        if prof:
+            prof.lap('u.input')
+        if result == 'restart':
+            return result
+        advance(self.state, self.player)
+        return result
     
-    for i, line in enumerate(sprite):
-        safe_addstr(stdscr, player.y + i + shake_y, int(player.x) + shake_x, line, color)
+    def run(self, ticks: int, policy=None) -> int:
+        """Advance up to `ticks` frames, stopping early on game over or quit.
 
+        `policy(state, player)` is called once per tick and returns the input
+        for that tick, in any form `tick` accepts. Returns the number of ticks
+        simulated.
+        """
+        start = self.ticks
+        state, player = self.state, self.player
+        for _ in range(ticks):
+            if not state.running or state.game_over:
+                break
+            self.tick(policy(state, player) if policy else None)
+        return self.ticks - start
 
-def render_entities(stdscr, state: GameState):
-    for e in state.entities:
-        if e.y < 1 or e.y > state.height - 5:
-            continue
-        
-        # Glow effect for good items
-        glow = int(math.sin(e.glow_phase) * 2 + 2) if e.is_good else 0
-        
-        color = curses.color_pair(6 if e.is_good else 1)
-        if e.is_good:
-            color |= curses.A_BOLD
-        
-        # Better brackets
-        if e.is_good:
-            text = f"✧ {e.text} ✧"
-        else:
-            text = f"[{e.text}]"
-        
-        safe_addstr(stdscr, int(e.y), int(e.x), text, color)
+# ═══════════════════════════════════════════════════════════════════════════
+# REPLAYS
+# ═══════════════════════════════════════════════════════════════════════════
 
+# Replay file: header (magic, version, seed, width, height) followed by one
+# record per input event: a varint tick delta and a one-byte event code.
+# Printable characters are their own code; code 0 marks the final tick,
+# after which comes the keyframe index (see KeyframeStore.encode).
+REPLAY_MAGIC = b'LSRP'
+REPLAY_VERSION = 1
+REPLAY_HEADER = struct.Struct('<4sBQHH')
 
-def render_particles(stdscr, state: GameState):
-    for p in state.particles:
-        if 0 <= int(p.y) < state.height and 0 <= int(p.x) < state.width:
-            # Fade out
-            attr = curses.A_BOLD if p.life > p.max_life // 2 else curses.A_DIM
-            safe_addstr(stdscr, int(p.y), int(p.x), p.char, curses.color_pair(p.color) | attr)
+EVENT_CODES = {EV_UP: 1, EV_DOWN: 2, EV_LEFT: 3, EV_RIGHT: 4, EV_BACKSPACE: 5}
+CODE_EVENTS = {code: event for event, code in EVENT_CODES.items()}
 
 
-def render_floats(stdscr, state: GameState):
-    for f in state.floats:
-        attr = curses.A_BOLD if f.life > f.max_life // 2 else curses.A_NORMAL
-        safe_addstr(stdscr, int(f.y), f.x, f.text, curses.color_pair(f.color) | attr)
+def _put_varint(buf: bytearray, n: int):
+    while n >= 0x80:
+        buf.append(n & 0x7F | 0x80)
+        n >>= 7
+    buf.append(n)
 
 
-def render_boss(stdscr, state: GameState):
-    if not state.boss:
-        return
+def _get_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _xor(data: bytes, base: bytes) -> bytes:
+    """`data` XOR `base`, with `base` zero-padded or cut to len(data)"""
+    n = len(data)
+    base = base[:n].ljust(n, b'\0')
+    return (int.from_bytes(data, 'little') ^ int.from_bytes(base, 'little')).to_bytes(n, 'little')
+
+
+class KeyframeStore:
+    """Save-game snapshots taken every `interval` ticks, for replay seeking.
+
+    Every `group`-th keyframe is stored whole; the ones in between are stored
+    as the XOR against their predecessor, so the unchanged bulk of a snapshot
+    turns into zero runs that zlib squeezes to almost nothing. Once `limit`
+    keyframes exist every other one is dropped and the interval doubles, which
+    bounds memory however long the session runs.
+    """
+    FULL, DELTA = 0, 1
     
-    boss = state.boss
-    shake = random.randint(-1, 1) if boss.shake > 0 else 0
+    def __init__(self, interval: int = KEYFRAME_TICKS, group: int = KEYFRAME_GROUP,
+                 limit: int = MAX_KEYFRAMES):
+        self.interval = interval
+        self.group = group
+        self.limit = limit
+        self.ticks: List[int] = []
+        self.frames: List[Tuple[int, int, bytes]] = []   # (kind, length, zlib blob)
+        self.last = b''
     
-    color = curses.color_pair(5)
-    if boss.phase >= 3:
-        color = curses.color_pair(1) | curses.A_BOLD if state.frame % 4 < 2 else curses.color_pair(5)
+    def __len__(self) -> int:
+        return len(self.ticks)
     
-    for i, line in enumerate(boss.art):
-        safe_addstr(stdscr, boss.y + i + shake, boss.x + shake, line, color)
+    @property
+    def nbytes(self) -> int:
+        return sum(len(blob) for _, _, blob in self.frames)
     
-    # Health bar with gradient
-    bar_y = boss.y + len(boss.art) + 1
+    def due(self, tick: int) -> bool:
+        return tick % self.interval == 0 and (not self.ticks or tick > self.ticks[-1])
+    
+    def add(self, tick: int, snapshot: bytes):
+        if len(self.ticks) % self.group == 0:
+            frame = (self.FULL, len(snapshot), zlib.compress(snapshot, 1))
+        else:
+            frame = (self.DELTA, len(snapshot), zlib.compress(_xor(snapshot, self.last), 1))
+        self.ticks.append(tick)
+        self.frames.append(frame)
+        self.last = snapshot
+        if len(self.ticks) >= self.limit:
+            self._thin()
+    
+    def snapshot(self, i: int) -> bytes:
+        """Decode keyframe `i` from the full keyframe that starts its group"""
+        start = i - i % self.group
+        data = b''
+        for kind, length, blob in self.frames[start:i + 1]:
+            raw = zlib.decompress(blob)
+            data = raw if kind == self.FULL else _xor(raw, data)
+        return data
+    
+    def nearest(self, tick: int) -> Optional[Tuple[int, bytes]]:
+        """The latest keyframe at or before `tick`, as (tick, snapshot)"""
+        i = bisect_right(self.ticks, tick) - 1
+        if i < 0:
+            return None
+        return self.ticks[i], self.snapshot(i)
+    
+    def _thin(self):
+        kept = [(self.ticks[i], self.snapshot(i)) for i in range(0, len(self.ticks), 2)]
+        self.interval *= 2
+        self.ticks, self.frames = [], []
+        for tick, snapshot in kept:
+            self.add(tick, snapshot)
+    
+    def encode(self, buf: bytearray):
+        """Append as: interval, group, count, then (tick, kind, length, size, blob) each"""
+        _put_varint(buf, self.interval)
+        _put_varint(buf, self.group)
+        _put_varint(buf, len(self.ticks))
+        for tick, (kind, length, blob) in zip(self.ticks, self.frames):
+            _put_varint(buf, tick)
+            buf.append(kind)
+            _put_varint(buf, length)
+            _put_varint(buf, len(blob))
+            buf += blob
+    
+    @classmethod
+    def decode(cls, data: bytes, pos: int) -> 'KeyframeStore':
+        interval, pos = _get_varint(data, pos)
+        group, pos = _get_varint(data, pos)
+        store = cls(interval, group)
+        count, pos = _get_varint(data, pos)
+        for _ in range(count):
+            tick, pos = _get_varint(data, pos)
+            kind = data[pos]
+            length, pos = _get_varint(data, pos + 1)
+            size, pos = _get_varint(data, pos)
+            store.ticks.append(tick)
+            store.frames.append((kind, length, data[pos:pos + size]))
+            pos += size
+        if store.ticks:
+            store.last = store.snapshot(len(store.ticks) - 1)
+        return store
+
+
+class ReplayRecorder:
+    """Compact binary log of a session: its seed plus a (tick, event) stream"""
+    def __init__(self, seed: int, width: int, height: int):
+        self.data = bytearray(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed, width, height))
+        self.last_tick = 0
+        self.keyframes = KeyframeStore()
+    
+    def record(self, tick: int, events):
+        for event in events:
+            code = EVENT_CODES.get(event) or ord(event)
+            _put_varint(self.data, tick - self.last_tick)
+            self.data.append(code)
+            self.last_tick = tick
+    
+    def finish(self, ticks: int) -> bytes:
+        """The finished replay of a session that ran for `ticks` ticks"""
+        data = bytearray(self.data)
+        _put_varint(data, max(0, ticks - self.last_tick))
+        data.append(0)
+        self.keyframes.encode(data)
+        return bytes(data)
+
+
+def _parse_replay(data: bytes) -> Tuple[int, int, int, List[Tuple[int, str]], int, int]:
+    magic, version, seed, width, height = REPLAY_HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError("not a Life Simulator replay (or an unsupported version)")
+    stream = []
+    pos, tick = REPLAY_HEADER.size, 0
+    while True:
+        delta, pos = _get_varint(data, pos)
+        tick += delta
+        code = data[pos]
+        pos += 1
+        if code == 0:
+            return seed, width, height, stream, tick, pos
+        stream.append((tick, CODE_EVENTS.get(code) or chr(code)))
+
+
+def parse_replay(data: bytes) -> Tuple[int, int, int, List[Tuple[int, str]], int]:
+    """Decode a replay into (seed, width, height, [(tick, event)], total ticks)"""
+    return _parse_replay(data)[:5]
+
+
+class ReplaySeeker:
+    """Random access into a recorded session.
+
+    Seeking restores the nearest keyframe at or before the target tick and
+    simulates forward from there. Keyframes missing from the file (ticks past
+    the last stored one) are taken along the way, so each stretch of the
+    session is simulated at most once.
+    """
+    def __init__(self, data: bytes, entity_arrays: bool = False):
+        self.seed, self.width, self.height, self.stream, self.end, pos = _parse_replay(data)
+        self.keyframes = KeyframeStore.decode(data, pos)
+        self.event_ticks = [tick for tick, _ in self.stream]
+        self.entity_arrays = entity_arrays
+    
+    def seek(self, tick: int) -> Simulation:
+        """A Simulation that has run exactly min(tick, end) ticks of the session"""
+        tick = min(tick, self.end)
+        found = self.keyframes.nearest(tick)
+        if found:
+            sim = load_snapshot(found[1], entity_arrays=self.entity_arrays)
+        else:
+            sim = Simulation(self.width, self.height, self.entity_arrays, seed=self.seed)
+        stream, keyframes = self.stream, self.keyframes
+        i = bisect_left(self.event_ticks, sim.ticks)
+        while sim.ticks < tick:
+            if keyframes.due(sim.ticks):
+                keyframes.add(sim.ticks, save_snapshot(sim))
+            events = []
+            while i < len(stream) and stream[i][0] == sim.ticks:
+                events.append(stream[i][1])
+                i += 1
+            sim.tick(events)
+        return sim
+
+
+def replay(data: bytes, until: Optional[int] = None, entity_arrays: bool = False) -> Simulation:
+    """Re-simulate a recorded session headless, up to tick `until` or its end"""
+    seeker = ReplaySeeker(data, entity_arrays)
+    return seeker.seek(seeker.end if until is None else until)
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SAVE GAMES
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Save file: header (magic, version, CRC-32 and length of the payload), then
+# the payload: fixed-layout struct records for each object, length-prefixed
+# UTF-8 strings and raw bytes for the maze grid. Both RNG states are stored,
+# so a loaded game continues exactly as the saved one would have.
+SAVE_MAGIC = b'LSSV'
+SAVE_VERSION = 1
+SAVE_HEADER = struct.Struct('<4sBII')
+
+
+class _Record:
+    """Fixed struct layout for a set of scalar attributes"""
+    def __init__(self, *fields: Tuple[str, str]):
+        self.names = [name for name, _ in fields]
+        self.struct = struct.Struct('<' + ''.join(code for _, code in fields))
+    
+    def write(self, out: 'SaveWriter', obj):
+        out.buf += self.struct.pack(*[getattr(obj, name) for name in self.names])
+    
+    def read(self, src: 'SaveReader', obj):
+        for name, value in zip(self.names, src.unpack(self.struct)):
+            setattr(obj, name, value)
+
+
+PLAYER_RECORD = _Record(
+    ('x', 'd'), ('y', 'i'), ('will', 'i'), ('max_will', 'i'), ('score', 'q'), ('age', 'i'),
+    ('sprite_timer', 'i'), ('invincible', 'i'), ('coffee', 'i'), ('shield', 'i'), ('rage', 'i'),
+    ('combo', 'i'), ('combo_timer', 'i'), ('max_combo', 'i'),
+    ('wanted', 'i'), ('crimes', 'i'), ('arrests', 'i'), ('prison_time', 'i'), ('keys', 'i'),
+    ('bosses_fought', 'i'), ('bosses_defeated', 'i'), ('tasks_completed', 'i'),
+    ('moving_left', '?'), ('moving_right', '?'), ('long_sentence', '?'))
+STATE_RECORD = _Record(
+    ('paused', '?'), ('game_over', '?'), ('frame', 'q'), ('difficulty', 'd'),
+    ('boss_cooldown', 'i'), ('challenge_cooldown', 'i'), ('screen_shake', 'i'),
+    ('message_timer', 'i'), ('message_color', 'i'), ('ground_offset', 'd'), ('spawned', 'q'))
+ENTITY_RECORD = _Record(
+    ('x', 'd'), ('y', 'd'), ('is_good', '?'), ('effect', 'i'), ('speed', 'd'),
+    ('wave', 'd'), ('glow_phase', 'd'))
+PARTICLE_RECORD = _Record(
+    ('x', 'd'), ('y', 'd'), ('color', 'i'), ('vx', 'd'), ('vy', 'd'), ('life', 'i'), ('max_life', 'i'))
+FLOAT_RECORD = _Record(('x', 'i'), ('y', 'd'), ('color', 'i'), ('life', 'i'), ('max_life', 'i'))
+BOSS_RECORD = _Record(
+    ('hp', 'i'), ('x', 'i'), ('y', 'i'), ('phase', 'i'), ('attack_timer', 'i'),
+    ('defeated', '?'), ('shake', 'i'))
+TYPING_RECORD = _Record(
+    ('timer', 'd'), ('max_timer', 'd'), ('active', '?'), ('success', '?'), ('cursor_blink', 'i'))
+MAZE_RECORD = _Record(
+    ('width', 'i'), ('height', 'i'), ('player_x', 'i'), ('player_y', 'i'), ('keys', 'i'),
+    ('active', '?'), ('escaped', '?'), ('move_cooldown', 'i'))
+
+_U32 = struct.Struct('<I')
+_RNG_STATE = struct.Struct('<625I?d')
+_ZONE_TICKS = struct.Struct('<Bq')
+
+
+class SaveWriter:
+    def __init__(self):
+        self.buf = bytearray()
+    
+    def pack(self, fmt: struct.Struct, *values):
+        self.buf += fmt.pack(*values)
+    
+    def blob(self, data: bytes):
+        self.buf += _U32.pack(len(data))
+        self.buf += data
+    
+    def text(self, value: str):
+        self.blob(value.encode())
+    
+    def rng(self, rng: random.Random):
+        version, internal, gauss = rng.getstate()
+        self.buf += _RNG_STATE.pack(*internal, gauss is not None, gauss or 0.0)
+
+
+class SaveReader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+    
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        values = fmt.unpack_from(self.data, self.pos)
+        self.pos += fmt.size
+        return values
+    
+    def count(self) -> int:
+        return self.unpack(_U32)[0]
+    
+    def blob(self) -> bytes:
+        n = self.count()
+        self.pos += n
+        return self.data[self.pos - n:self.pos]
+    
+    def text(self) -> str:
+        return self.blob().decode()
+    
+    def rng(self, rng: random.Random):
+        *internal, has_gauss, gauss = self.unpack(_RNG_STATE)
+        rng.setstate((3, tuple(internal), gauss if has_gauss else None))
+
+
+def save_snapshot(sim: Simulation) -> bytes:
+    """Serialize a running game into a self-checking binary snapshot"""
+    state, player = sim.state, sim.player
+    out = SaveWriter()
+    out.pack(struct.Struct('<QqHH'), state.seed, sim.ticks, state.width, state.height)
+    out.rng(state.rng)
+    out.rng(state.fx)
+    for spec in (MAZE_SPEC, LONG_SENTENCE_SPEC):
+        out.pack(_U32, state.mazes.taken[spec])
+    
+    PLAYER_RECORD.write(out, player)
+    out.pack(struct.Struct('<?'), isinstance(player.x, int))
+    out.text(player.sprite)
+    
+    STATE_RECORD.write(out, state)
+    out.pack(struct.Struct('<B'), state.zone.value)
+    out.text(state.mode)
+    out.text(state.message)
+    out.pack(_U32, len(state.zone_ticks))
+    for zone, ticks in state.zone_ticks.items():
+        out.pack(_ZONE_TICKS, zone.value, ticks)
+    
+    out.pack(_U32, len(state.entities))
+    for e in state.entities:
+        ENTITY_RECORD.write(out, e)
+        out.text(e.text)
+    out.pack(_U32, len(state.particles))
+    for p in state.particles:
+        PARTICLE_RECORD.write(out, p)
+        out.text(p.char)
+    out.pack(_U32, len(state.floats))
+    for f in state.floats:
+        FLOAT_RECORD.write(out, f)
+        out.text(f.text)
+    
+    out.text(state.boss.name if state.boss else '')
+    if state.boss:
+        BOSS_RECORD.write(out, state.boss)
+    
+    out.text(state.typing.word if state.typing else '')
+    if state.typing:
+        TYPING_RECORD.write(out, state.typing)
+        out.text(state.typing.typed)
+    
+    maze = state.maze
+    out.pack(struct.Struct('<?'), maze is not None)
+    if maze:
+        MAZE_RECORD.write(out, maze)
+        out.blob(maze.maze)
+        out.blob(array('i', maze.key_cells).tobytes())
+    
+    payload = bytes(out.buf)
+    header = SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, zlib.crc32(payload), len(payload))
+    return header + payload
+
+
+def load_snapshot(data: bytes, width: Optional[int] = None, height: Optional[int] = None,
+                  entity_arrays: bool = False) -> Simulation:
+    """Rebuild a Simulation from `save_snapshot` output.
+
+    `width`/`height` override the saved terminal size, so a game saved in one
+    window can resume in another; the player is then put back on the ground
+    row and inside the screen. Raises ValueError on a foreign, outdated or
+    damaged file.
+    """
+    magic, version, crc, length = SAVE_HEADER.unpack_from(data)
+    payload = data[SAVE_HEADER.size:SAVE_HEADER.size + length]
+    if magic != SAVE_MAGIC or version != SAVE_VERSION:
+        raise ValueError("not a Life Simulator save (or an unsupported version)")
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise ValueError("save file is damaged")
+    
+    src = SaveReader(payload)
+    seed, ticks, saved_width, saved_height = src.unpack(struct.Struct('<QqHH'))
+    sim = Simulation(width or saved_width, height or saved_height, entity_arrays, seed=seed)
+    state, player = sim.state, sim.player
+    sim.ticks = state.tick = ticks
+    src.rng(state.rng)
+    src.rng(state.fx)
+    for spec in (MAZE_SPEC, LONG_SENTENCE_SPEC):
+        state.mazes.taken[spec] = src.count()
+    
+    PLAYER_RECORD.read(src, player)
+    if src.unpack(struct.Struct('<?'))[0]:   # player.x was an int
+        player.x = int(player.x)
+    if (state.width, state.height) != (saved_width, saved_height):
+        # Stand on the new ground row, inside the range the player can move in
+        player.y = state.height - 7
+        player.x = type(player.x)(min(max(player.x, 1), state.width - 8))
+    player.sprite = src.text()
+    
+    STATE_RECORD.read(src, state)
+    state.zone = Zone(src.unpack(struct.Struct('<B'))[0])
+    state.mode = src.text()
+    state.message = src.text()
+    for _ in range(src.count()):
+        zone, zone_ticks = src.unpack(_ZONE_TICKS)
+        state.zone_ticks[Zone(zone)] = zone_ticks
+    
+    # Spawn order is list order; sequence numbers just need to keep it
+    n = src.count()
+    for i in range(n):
+        e = Entity.__new__(Entity)
+        ENTITY_RECORD.read(src, e)
+        e.kind = entity_kind(src.text(), e.effect)
+        e.width = ENTITY_KINDS[e.kind].width
+        e.seq = state.spawned - n + i
+        e.row = None
+        state.entities.append(e)
+        if not isinstance(state.entities, EntityStore):
+            state.grid.insert(e)
+    for _ in range(src.count()):
+        p = state.particles.emit()
+        PARTICLE_RECORD.read(src, p)
+        p.char = src.text()
+    for _ in range(src.count()):
+        f = state.floats.emit()
+        FLOAT_RECORD.read(src, f)
+        f.text = src.text()
+    
+    boss_name = src.text()
+    if boss_name:
+        zone = next(z for z, data in BOSSES.items() if data['name'] == boss_name)
+        state.boss = Boss(zone, 0, 0)
+        BOSS_RECORD.read(src, state.boss)
+    
+    word = src.text()
+    if word:
+        state.typing = TypingChallenge.__new__(TypingChallenge)
+        state.typing.word = word
+        TYPING_RECORD.read(src, state.typing)
+        state.typing.typed = src.text()
+    
+    if src.unpack(struct.Struct('<?'))[0]:
+        maze = MazeGame.__new__(MazeGame)
+        MAZE_RECORD.read(src, maze)
+        maze.maze = bytearray(src.blob())
+        maze.key_cells = list(array('i', src.blob()))
+        maze.exit = (maze.height - 2) * maze.width + maze.width - 2
+        maze._index()
+        maze.track()
+        maze.row_cache = {}
+        state.maze = maze
+    return sim
+
+
+class SaveFile:
+    """Writes snapshots to `path` from a background thread.
+
+    Each write goes to a temporary file that is fsynced and then renamed
+    over the real one, so a power cut leaves either the old save or the new
+    one, never half of each. Only the newest pending snapshot is kept.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.pending: Optional[bytes] = None
+        self.cond = threading.Condition()
+        self.stopping = False
+        self.worker = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self.worker.start()
+    
+    def load(self, width: int, height: int) -> Optional[Simulation]:
+        try:
+            return load_snapshot(self.path.read_bytes(), width, height)
+        except (OSError, ValueError, struct.error):
+            return None
+    
+    def submit(self, snapshot: bytes):
+        with self.cond:
+            self.pending = snapshot
+            self.cond.notify()
+    
+    def discard(self):
+        """Queue removal of the save, e.g. once the game it holds is over"""
+        self.submit(b'')
+    
+    def close(self):
+        """Flush the last pending snapshot and stop the writer"""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        self.worker.join()
+    
+    def _write(self, snapshot: bytes):
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+    
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.pending is None and not self.stopping:
+                    self.cond.wait()
+                snapshot, self.pending = self.pending, None
+                stopping = self.stopping
+            try:
+                if snapshot:
+                    self._write(snapshot)
+                elif snapshot is not None:
+                    self.path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            if stopping:
+                return
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LEADERBOARD
+# ═══════════════════════════════════════════════════════════════════════════
+
+ZONE_COLUMNS = [f"{zone.name.lower()}_ticks" for zone in Zone]
+RUN_COLUMNS = ['played_at', 'day', 'seed', 'score', 'age', 'bosses', 'tasks',
+               'crimes', 'arrests', 'zone'] + ZONE_COLUMNS
+LEADERBOARD_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    seed INTEGER NOT NULL,      -- unsigned 64-bit seed stored as signed
+    score INTEGER NOT NULL,
+    age INTEGER NOT NULL,
+    bosses INTEGER NOT NULL,
+    tasks INTEGER NOT NULL,
+    crimes INTEGER NOT NULL,
+    arrests INTEGER NOT NULL,
+    zone TEXT NOT NULL,
+    {', '.join(f'{column} INTEGER NOT NULL DEFAULT 0' for column in ZONE_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_zone ON runs (zone, score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_day ON runs (day, score DESC);
+"""
+
+
+def _signed_seed(seed: int) -> int:
+    """Seeds run to 2**64-1 but SQLite integers are signed; `% 2**64` undoes this"""
+    return seed - 2 ** 64 if seed >= 2 ** 63 else seed
+
+
+class Leaderboard:
+    """Finished runs in SQLite, written and queried off the frame loop.
+
+    A background thread owns the connection (WAL mode). `record` and `request`
+    only enqueue work; the thread drains the queue, inserts every queued run in
+    one transaction and answers queries into `results`, which the renderer
+    reads whenever it likes. Top-N queries walk the (key, score) indexes, so
+    they stay in the milliseconds however many rows pile up. If the database
+    can't be opened or written, `error` holds the reason and queries answer [].
+    """
+    def __init__(self, path: Path):
+        self.path = str(path)
+        self.jobs: queue.Queue = queue.Queue()
+        self.results: Dict[tuple, List[tuple]] = {}
+        self.error: Optional[str] = None
+        self.worker = threading.Thread(target=self._run, name='leaderboard', daemon=True)
+        self.worker.start()
+    
+    def record(self, state: GameState, player: Player):
+        now = time.time()
+        zone_ticks = [state.zone_ticks.get(zone, 0) for zone in Zone]
+        self.jobs.put(('insert', (now, time.strftime('%Y-%m-%d', time.localtime(now)),
+                                  _signed_seed(state.seed), player.score, player.age,
+                                  player.bosses_defeated,
+                                  player.tasks_completed, player.crimes, player.arrests,
+                                  state.zone.name, *zone_ticks)))
+    
+    def request(self, key: tuple, limit: int = LEADERBOARD_SIZE):
+        """Queue a top-`limit` query: ('all',), ('zone', NAME) or ('day', 'YYYY-MM-DD')"""
+        self.jobs.put(('query', (key, limit)))
+    
+    def watch(self, state: GameState, player: Player):
+        """Record the run and fetch the game-over lists once it has ended"""
+        if state.game_over and not state.run_recorded:
+            state.run_recorded = True
+            for key in self.keys_for(state):
+                self.results.pop(key, None)
+            self.record(state, player)
+            for key in self.keys_for(state):
+                self.request(key)
+    
+    @staticmethod
+    def keys_for(state: GameState) -> List[tuple]:
+        return [('all',), ('zone', state.zone.name), ('day', time.strftime('%Y-%m-%d'))]
+    
+    def top(self, key: tuple, limit: int = 10) -> List[tuple]:
+        """Blocking query, for the command line"""
+        done = threading.Event()
+        self.jobs.put(('query', (key, limit, done)))
+        if not done.wait(LEADERBOARD_TIMEOUT):
+            self.error = self.error or "timed out waiting for the database"
+            return []
+        return self.results.get(key, [])
+    
+    def close(self):
+        self.jobs.put(('stop', None))
+        self.worker.join()
+    
+    def _query(self, db: sqlite3.Connection, key: tuple, limit: int) -> List[tuple]:
+        columns = "score, age, bosses, tasks, zone, day, seed"
+        if key[0] == 'all':
+            sql, args = f"SELECT {columns} FROM runs ORDER BY score DESC LIMIT ?", (limit,)
+        else:
+            sql = f"SELECT {columns} FROM runs WHERE {key[0]} = ? ORDER BY score DESC LIMIT ?"
+            args = (key[1], limit)
+        return [row[:-1] + (row[-1] % 2 ** 64,) for row in db.execute(sql, args)]
+    
+    def _open(self) -> Optional[sqlite3.Connection]:
+        try:
+            db = sqlite3.connect(self.path)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(LEADERBOARD_SCHEMA)
+            return db
+        except (sqlite3.Error, OSError) as exc:
+            self.error = str(exc)
+            return None
+    
+    def _run(self):
+        db = self._open()                   # None: keep draining jobs, answer []
+        insert = f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}) VALUES ({', '.join('?' * len(RUN_COLUMNS))})"
+        running = True
+        while running:
+            jobs = [self.jobs.get()]
+            while True:
+                try:
+                    jobs.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [args for kind, args in jobs if kind == 'insert']
+            if rows and db:
+                try:
+                    with db:
+                        db.executemany(insert, rows)
+                except (sqlite3.Error, OSError, OverflowError, ValueError) as exc:
+                    self.error = str(exc)
+            for kind, args in jobs:
+                if kind == 'query':
+                    key, limit, *done = args
+                    try:
+                        self.results[key] = self._query(db, key, limit) if db else []
+                    except (sqlite3.Error, OSError, OverflowError, ValueError) as exc:
+                        self.error = str(exc)
+                        self.results[key] = []
+                    finally:
+                        for event in done:
+                            event.set()
+                elif kind == 'stop':
+                    running = False
+        if db:
+            db.close()
+
+# ═══════════════════════════════════════════════════════════════════════════
+# TELEMETRY
+# ═══════════════════════════════════════════════════════════════════════════
+
+TELEMETRY_FIELDS = ('event', 'tick', 'seed', 'score', 'will', 'age', 'zone', 'wanted',
+                    'combo', 'keys', 'detail')
+
+
+class Telemetry:
+    """Structured gameplay events, appended to a JSONL log off the frame loop.
+
+    `emit` only appends a tuple to a bounded in-memory ring; a background thread
+    wakes every TELEMETRY_FLUSH seconds, drains the ring and writes the whole
+    batch with one call. When the ring overflows the oldest events are dropped
+    and a 'dropped' line records how many; a batch that can't be written counts
+    as dropped too. The log rotates past `max_bytes` (events.jsonl ->
+    events.jsonl.1 -> ...), keeping `keep` old files. Each event's tick is the
+    simulation tick, the same numbering replays and seeks use.
+    """
+    def __init__(self, path: Path, capacity: int = TELEMETRY_BUFFER,
+                 max_bytes: int = TELEMETRY_MAX_BYTES, keep: int = TELEMETRY_KEEP):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.events: deque = deque(maxlen=capacity)
+        self.dropped = 0
+        self.written = 0
+        self.error: Optional[str] = None
+        self.stopping = threading.Event()
+        self.worker = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self.worker.start()
+    
+    def emit(self, state: GameState, player: Player, kind: str, detail: tuple = ()):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append((kind, state.tick, state.seed, player.score, player.will,
+                            player.age, state.zone.name, player.wanted, player.combo,
+                            player.keys, detail))
+    
+    def flush(self):
+        batch = []
+        events = self.events
+        while events:
+            batch.append(events.popleft())
+        dropped, self.dropped = self.dropped, 0
+        if not batch and not dropped:
+            return
+        lines = [json.dumps(dict(zip(TELEMETRY_FIELDS, event)), ensure_ascii=False,
+                            separators=(',', ':')) for event in batch]
+        if dropped:
+            lines.append(json.dumps({'event': 'dropped', 'count': dropped}))
+        data = ('\n'.join(lines) + '\n').encode()
+        try:
+            with open(self.path, 'ab') as f:
+                f.write(data)
+                size = f.tell()
+            self.written += len(batch)
+            if size >= self.max_bytes:
+                self._rotate()
+        except OSError as exc:
+            # Disk full, log removed or unwritable: lose this batch, keep going
+            self.dropped += dropped + len(batch)
+            self.error = str(exc)
+    
+    def _rotate(self):
+        for i in range(self.keep - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.keep:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+    
+    def close(self):
+        self.stopping.set()
+        self.worker.join()
+    
+    def _run(self):
+        while not self.stopping.wait(TELEMETRY_FLUSH):
+            self.flush()
+        self.flush()
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PROFILER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class FrameProfiler:
+    """Per-phase frame timings with rolling histograms.
+
+    `lap(name)` charges the time since the previous lap to `name`, and
+    `end_frame` closes the frame. A lap is one perf_counter call, cheap enough
+    to stay wired into the hot paths. Headless runs leave state.profiler at
+    None and skip the laps entirely.
+    """
+    PHASES = ('input', 'u.replay', 'u.input', 'u.timers', 'u.spawn', 'u.move', 'u.collide',
+              'u.particles', 'save', 'r.background', 'r.boss', 'r.entities', 'r.sprites', 'r.typing',
+              'r.maze', 'r.ui', 'flush', 'total')
+    BUCKETS_MS = (0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+    BARS = ' ▁▂▃▄▅▆▇█'
+    
+    def __init__(self, window: int = 120, log_path: Optional[str] = None):
+        self.window = window
+        self.samples: Dict[str, deque] = {}
+        self.current: Dict[str, float] = {}
+        self.mark = time.perf_counter()
+        self.visible = False
+        self.frames = 0
+        self.log = None
+        if log_path:
+            self.log = open(log_path, 'w', buffering=1 << 16)
+            self.log.write('frame,' + ','.join(self.PHASES) + '\n')
+    
+    def start_frame(self):
+        self.mark = time.perf_counter()
+    
+    def lap(self, name: str):
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + now - self.mark
+        self.mark = now
+    
+    def end_frame(self):
+        current = self.current
+        current['total'] = sum(current.values())
+        for name, seconds in current.items():
+            ring = self.samples.get(name)
+            if ring is None:
+                ring = self.samples[name] = deque([0.0] * self.frames, maxlen=self.window)
+            ring.append(seconds)
+        for name, ring in self.samples.items():
+            if name not in current:
+                ring.append(0.0)
+        if self.log:
+            self.log.write(f"{self.frames}," + ','.join(
+                f"{current.get(name, 0.0) * 1000:.4f}" for name in self.PHASES) + '\n')
+        self.frames += 1
+        self.current = {}
+    
+    def report(self) -> List[Tuple[str, float, float, str]]:
+        """(phase, avg ms, p99 ms, histogram sparkline) per phase, total last"""
+        rows = []
+        for name in sorted(self.samples, key=self.PHASES.index):
+            ms = sorted(t * 1000 for t in self.samples[name])
+            counts = [0] * (len(self.BUCKETS_MS) + 1)
+            for t in ms:
+                counts[sum(t >= edge for edge in self.BUCKETS_MS)] += 1
+            peak = max(counts) or 1
+            hist = ''.join(self.BARS[round(c / peak * (len(self.BARS) - 1))] for c in counts)
+            p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+            rows.append((name, sum(ms) / len(ms), p99, hist))
+        return rows
+    
+    def close(self):
+        if self.log:
+            self.log.close()
+            self.log = None
+
+
+class _NoProfiler:
+    """Stand-in so render code can lap unconditionally"""
+    def lap(self, name: str):
+        pass
+
+
+NO_PROFILER = _NoProfiler()
+
+# ═══════════════════════════════════════════════════════════════════════════
+# FRAME BUFFER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class FrameBuffer:
+    """Off-screen cell buffer that the render_* functions draw into.
+
+    Mimics the part of the curses window API the renderers use (addstr,
+    getmaxyx, erase, refresh). One cell per terminal column: a wide glyph
+    fills its cell and leaves an empty continuation cell after it. `refresh`
+    diffs the frame against the previous one and writes only the runs of
+    changed cells to the real window, then estimates the bytes that took
+    (`frame_bytes`): cursor address and text as an ANSI terminal would get
+    them, plus a flat 8 per attribute switch. curses may send fewer.
+    Each of `sinks` is also called with the runs and whether they repaint
+    the whole frame, for output that is not a curses window.
+    """
+    def __init__(self, window=None, height: int = MIN_HEIGHT, width: int = MIN_WIDTH):
+        if window is not None:
+            height, width = window.getmaxyx()
+        self.window = window
+        self.height = height
+        self.width = width
+        self.blank_chars = [' '] * width
+        self.blank_attrs = [0] * width
+        self.chars = [self.blank_chars[:] for _ in range(height)]
+        self.attrs = [self.blank_attrs[:] for _ in range(height)]
+        self.prev_chars = [self.blank_chars[:] for _ in range(height)]
+        self.prev_attrs = [self.blank_attrs[:] for _ in range(height)]
+        self.full_redraw = True
+        self.frame_bytes = 0
+        self.total_bytes = 0
+        self.sinks = []
+    
+    def getmaxyx(self) -> Tuple[int, int]:
+        return self.height, self.width
+    
+    def erase(self):
+        for row in self.chars:
+            row[:] = self.blank_chars
+        for row in self.attrs:
+            row[:] = self.blank_attrs
+    
+    clear = erase
+    
+    def invalidate(self):
+        """Repaint every cell on the next refresh (after a resize, say)"""
+        self.full_redraw = True
+    
+    def addstr(self, y: int, x: int, text: str, attr: int = 0):
+        if not 0 <= y < self.height:
+            return
+        chars, attrs, width = self.chars[y], self.attrs[y], self.width
+        for ch in text:
+            w = char_width(ch)
+            if w == 0:
+                # Combining marks / variation selectors ride on the previous cell
+                if 0 < x <= width:
+                    prev = x - 1 if chars[x - 1] else x - 2
+                    if prev >= 0:
+                        chars[prev] += ch
+                continue
+            if x + w > width:
+                break
+            if x >= 0:
+                if chars[x] == '' and x > 0:
+                    chars[x - 1] = ' '      # overwrote the tail of a wide glyph
+                if x + w < width and chars[x + w] == '':
+                    chars[x + w] = ' '      # overwrote the head of a wide glyph
+                chars[x] = ch
+                attrs[x] = attr
+                if w == 2:
+                    chars[x + 1] = ''
+                    attrs[x + 1] = attr
+            x += w
+    
+    def diff(self) -> List[Tuple[int, int, str, int]]:
+        """Runs of changed cells as (y, x, text, attr), left to right"""
+        runs = []
+        full, width = self.full_redraw, self.width
+        for y in range(self.height):
+            chars, attrs = self.chars[y], self.attrs[y]
+            prev_chars, prev_attrs = self.prev_chars[y], self.prev_attrs[y]
+            if not full and chars == prev_chars and attrs == prev_attrs:
+                continue
+            changed = [full or chars[i] != prev_chars[i] or attrs[i] != prev_attrs[i]
+                       for i in range(width)]
+            x = done = 0
+            while x < width:
+                if not changed[x]:
+                    x += 1
+                    continue
+                if chars[x] == '' and x > done:
+                    x -= 1                  # start on the head of a wide glyph
+                attr = attrs[x]
+                # Extend through same-attribute cells, bridging unchanged gaps
+                # shorter than a cursor jump would cost
+                last = end = x
+                while end < width and attrs[end] == attr:
+                    if changed[end]:
+                        last = end
+                    elif end - last >= 4:
+                        break
+                    end += 1
+                end = last + 1
+                while end < width and chars[end] == '':
+                    end += 1                # keep wide glyphs whole
+                runs.append((y, x, ''.join(chars[x:end]), attr))
+                x = done = end
+        return runs
+    
+    def refresh(self):
+        runs = self.diff()
+        nbytes = 0
+        last_attr = None
+        for y, x, text, attr in runs:
+            # Estimate: cursor address, attribute switch when needed, the text
+            nbytes += len(f"\x1b[{y + 1};{x + 1}H") + len(text.encode('utf-8'))
+            if attr != last_attr:
+                nbytes += 8
+                last_attr = attr
+        window = self.window
+        if window is not None:
+            if self.full_redraw:
+                window.erase()
+            for y, x, text, attr in runs:
+                try:
+                    window.addstr(y, x, text, attr)
+                except curses.error:
+                    pass                    # bottom-right cell: written, then errors
+            window.refresh()
+        for sink in self.sinks:
+            sink(runs, self.full_redraw)
+        self.frame_bytes = nbytes
+        self.total_bytes += nbytes
+        self.full_redraw = False
+        for y in range(self.height):
+            self.prev_chars[y][:] = self.chars[y]
+            self.prev_attrs[y][:] = self.attrs[y]
+        return runs
+    
+    def blit(self, spans):
+        """Copy pre-composed (y, x, chars, attrs) cell spans into the frame"""
+        for y, x, chars, attrs in spans:
+            row_chars, row_attrs = self.chars[y], self.attrs[y]
+            end = x + len(chars)
+            if row_chars[x] == '' and x > 0:
+                row_chars[x - 1] = ' '      # overwrote the tail of a wide glyph
+            if end < self.width and row_chars[end] == '':
+                row_chars[end] = ' '        # overwrote the head of a wide glyph
+            row_chars[x:end] = chars
+            row_attrs[x:end] = attrs
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ANSI OUTPUT
+# ═══════════════════════════════════════════════════════════════════════════
+
+# SGR colours for each pair set up in init_colors (pairs 1-7: that colour on
+# the default background)
+PAIR_SGR = {i: f"3{i}" for i in range(1, 8)}
+PAIR_SGR.update({8: "37;41", 9: "30;43"})
+ATTR_SGR = ((curses.A_BOLD, "1"), (curses.A_DIM, "2"), (curses.A_UNDERLINE, "4"),
+            (curses.A_BLINK, "5"), (curses.A_REVERSE, "7"))
+ANSI_RESET = "\x1b[0m\x1b[2J\x1b[H\x1b[?25h"
+
+
+@lru_cache(maxsize=256)
+def sgr(attr: int) -> str:
+    """Escape sequence selecting a curses attribute on a plain ANSI terminal"""
+    codes = ["0"]
+    pair = (attr & curses.A_COLOR) >> PAIR_SHIFT
+    if pair in PAIR_SGR:
+        codes.append(PAIR_SGR[pair])
+    codes.extend(code for flag, code in ATTR_SGR if attr & flag)
+    return f"\x1b[{';'.join(codes)}m"
+
+
+def frame_runs(screen: 'FrameBuffer') -> List[Tuple[int, int, str, int]]:
+    """The whole current frame as runs of same-attribute cells"""
+    runs = []
+    for y in range(screen.height):
+        chars, attrs = screen.chars[y], screen.attrs[y]
+        x = 0
+        while x < screen.width:
+            attr = attrs[x]
+            end = x + 1
+            while end < screen.width and attrs[end] == attr:
+                end += 1
+            runs.append((y, x, ''.join(chars[x:end]), attr))
+            x = end
+    return runs
+
+
+def encode_ansi(runs: List[Tuple[int, int, str, int]], full: bool = False) -> bytes:
+    """FrameBuffer diff runs as an ANSI byte stream (clearing first if `full`)"""
+    out = ["\x1b[?25l\x1b[0m\x1b[2J"] if full else []
+    last_attr = None
+    for y, x, text, attr in runs:
+        out.append(f"\x1b[{y + 1};{x + 1}H")
+        if attr != last_attr:
+            out.append(sgr(attr))
+            last_attr = attr
+        out.append(text)
+    return ''.join(out).encode('utf-8')
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ENHANCED RENDERING
+# ═══════════════════════════════════════════════════════════════════════════
+
+class RenderContext:
+    """Drawing target for one frame.
+
+    The render_* functions draw through it instead of the window. It reads
+    the screen size once, so clipping does not ask the window on every call,
+    and `pairs[n]` and `bold[n]` are the resolved color attributes.
+    """
+    pairs = tuple(color_pair(n) for n in range(COLOR_PAIRS))
+    bold = tuple(pair | curses.A_BOLD for pair in pairs)
+    
+    def __init__(self, screen):
+        self.screen = screen
+        self.height, self.width = screen.getmaxyx()
+    
+    def text(self, y: int, x: int, text: str, attr: int = 0):
+        """addstr that clips to the screen by cell width instead of failing"""
+        if y < 0 or y >= self.height or x >= self.width:
+            return
+        width = text_width(text)
+        if x < 0:
+            text = clip_text(text, -x, width + x)
+            width += x
+            x = 0
+        if x + width > self.width:
+            text = clip_text(text, 0, self.width - x - 1)
+        if text:
+            try:
+                self.screen.addstr(y, x, text, attr)
+            except curses.error:
+                pass
+    
+    def blit(self, spans):
+        """Copy pre-composed (y, x, chars, attrs) cell spans; screens without
+        FrameBuffer.blit get one `text` call per run of equal attributes"""
+        if isinstance(self.screen, FrameBuffer):
+            self.screen.blit(spans)
+            return
+        for y, x, chars, attrs in spans:
+            start = 0
+            for attr, group in groupby(attrs):
+                count = sum(1 for _ in group)
+                self.text(y, x + start, ''.join(chars[start:start + count]), attr)
+                start += count
+
+
+def safe_addstr(stdscr, y, x, text, attr=0):
+    """One clipped draw outside a frame (frames use a RenderContext)"""
+    RenderContext(stdscr).text(y, x, text, attr)
+
+
+class BackgroundLayer:
+    """Static scenery of one zone, pre-composed for one terminal size.
+
+    Holds the building art and the four phases of the scrolling ground as
+    ready-made cell spans, so a frame only blits them and draws the animated
+    sky and decorations.
+    """
+    def __init__(self, zone: Zone, width: int, height: int):
+        data = ZONE_DATA[zone]
+        self.key = (zone, width, height)
+        color = color_pair(data['color'])
+        
+        self.building = []
+        building = data.get('building', [])
+        if building:
+            bx = (width - data['building_width']) // 2
+            self.building = [(3 + i, bx, line, color) for i, line in enumerate(building)]
+        
+        self.ground_y = height - 4
+        gc = data['ground_char']
+        tile = gc * 3 + '·' + gc * 2 + '·'
+        pattern = tile * (width // len(tile) + 2)
+        ground_color = color_pair(data['ground_color'])
+        self.ground = [(self.ground_y, 0, pattern[offset:offset + width], ground_color)
+                       for offset in range(4)]
+        
+        self.decorations = data.get('decorations', [])
+        self.deco_color = color
+        
+        canvas = FrameBuffer(None, height, width)
+        self.building_spans = [span for op in self.building for span in self._compose(canvas, op)]
+        self.ground_spans = [self._compose(canvas, op) for op in self.ground]
+    
+    @staticmethod
+    def _compose(canvas: FrameBuffer, op) -> list:
+        """Draw one call onto a scratch canvas and lift out the cells it wrote"""
+        y = op[0]
+        if not 0 <= y < canvas.height:
+            return []
+        canvas.chars[y][:] = canvas.blank_chars
+        canvas.attrs[y][:] = [None] * canvas.width
+        safe_addstr(canvas, *op)
+        attrs = canvas.attrs[y]
+        spans, x = [], 0
+        while x < canvas.width:
+            if attrs[x] is None:
+                x += 1
+                continue
+            end = x
+            while end < canvas.width and attrs[end] is not None:
+                end += 1
+            spans.append((y, x, canvas.chars[y][x:end], attrs[x:end]))
+            x = end
+        return spans
+
+
+def get_background(state: GameState) -> BackgroundLayer:
+    """Cached static layer for the current zone, rebuilt on zone change or resize"""
+    layer = state.background
+    if layer is None or layer.key != (state.zone, state.width, state.height):
+        layer = state.background = BackgroundLayer(state.zone, state.width, state.height)
+    return layer
+
+
+def render_background(ctx: RenderContext, state: GameState):
+    layer = get_background(state)
+    
+    # Sky elements
+    if state.zone in [Zone.STREETS, Zone.PRISON]:
+        # Night sky with stars
+        for sx, sy, char in state.stars:
+            x = (sx + state.frame // 20) % state.width
+            brightness = curses.A_DIM if state.fx.random() > 0.5 else curses.A_NORMAL
+            ctx.text(sy, x, char, ctx.pairs[5] | brightness)
+    elif state.zone == Zone.BEACH:
+        # Sun and clouds
+        sun_x = (state.frame // 30) % state.width
+        ctx.text(1, sun_x, "☀️", ctx.bold[5])
+        for cx, cy in state.clouds:
+            x = (cx + state.frame // 40) % state.width
+            ctx.text(cy, x, "☁️", ctx.pairs[7])
+    
+    # Building and scrolling ground
+    offset = int(state.ground_offset)
+    ctx.blit(layer.building_spans)
+    ctx.blit(layer.ground_spans[offset])
+    
+    # Decorations on ground
+    decos = layer.decorations
+    if decos:
+        for i in range(3):
+            dx = (state.frame // 15 + i * 27) % state.width
+            deco = decos[(i + state.frame // 100) % len(decos)]
+            ctx.text(layer.ground_y - 1, dx, deco, layer.deco_color)
+
+
+def render_player(ctx: RenderContext, player: Player, state: GameState):
+    # Invincibility flashing
+    if player.invincible > 0 and state.frame % 6 < 3:
+        return
+    
+    sprite = SPRITES.get(player.sprite, SPRITES['normal'])
+    
+    color = ctx.pairs[4]
+    if player.coffee > 0:
+        color = ctx.bold[5]
+    if player.rage > 0:
+        color = ctx.bold[1]
+    if player.shield > 0:
+        color = ctx.bold[4]
+    
+    shake_x = state.fx.randint(-1, 1) if state.screen_shake > 0 else 0
+    shake_y = state.fx.randint(-1, 1) if state.screen_shake > 0 else 0
+    
+    for i, line in enumerate(sprite):
+        ctx.text(player.y + i + shake_y, int(player.x) + shake_x, line, color)
+
+
+def render_entities(ctx: RenderContext, state: GameState, alpha: float = 0.0):
+    for e in state.entities:
+        y = e.y + e.speed * alpha
+        if y < 1 or y > state.height - 5:
+            continue
+        
+        # Glow effect for good items
+        glow = int(math.sin(e.glow_phase) * 2 + 2) if e.is_good else 0
+        
+        color = ctx.pairs[6 if e.is_good else 1]
+        if e.is_good:
+            color |= curses.A_BOLD
+        
+        ctx.text(int(y), int(e.x), ENTITY_KINDS[e.kind].label, color)
+
+
+def render_particles(ctx: RenderContext, state: GameState, alpha: float = 0.0):
+    for p in state.particles:
+        x, y = int(p.x + p.vx * alpha), int(p.y + p.vy * alpha)
+        if 0 <= y < state.height and 0 <= x < state.width:
+            # Fade out
+            attr = curses.A_BOLD if p.life > p.max_life // 2 else curses.A_DIM
+            ctx.text(y, x, p.char, ctx.pairs[p.color] | attr)
+
+
+def render_floats(ctx: RenderContext, state: GameState, alpha: float = 0.0):
+    for f in state.floats:
+        attr = curses.A_BOLD if f.life > f.max_life // 2 else curses.A_NORMAL
+        ctx.text(int(f.y - 0.12 * alpha), f.x, f.text, ctx.pairs[f.color] | attr)
+
+
+def render_boss(ctx: RenderContext, state: GameState):
+    if not state.boss:
+        return
+    
+    boss = state.boss
+    shake = state.fx.randint(-1, 1) if boss.shake > 0 else 0
+    
+    color = ctx.pairs[5]
+    if boss.phase >= 3:
+        color = ctx.bold[1] if state.frame % 4 < 2 else ctx.pairs[5]
+    
+    for i, line in enumerate(boss.art):
+        ctx.text(boss.y + i + shake, boss.x + shake, line, color)
+    
+    # Health bar with gradient
+    bar_y = boss.y + len(boss.art) + 1
     bar_w = 35
     filled = int(bar_w * (boss.hp / boss.max_hp))
     
@@ -1164,13 +3319,13 @@ def render_boss(stdscr, state: GameState):
             bar += "░"
     
     hp_pct = boss.hp / boss.max_hp
-    bar_color = curses.color_pair(6) if hp_pct > 0.5 else curses.color_pair(5) if hp_pct > 0.25 else curses.color_pair(1)
+    bar_color = ctx.pairs[6] if hp_pct > 0.5 else ctx.pairs[5] if hp_pct > 0.25 else ctx.pairs[1]
     
-    safe_addstr(stdscr, bar_y, state.width // 2 - bar_w // 2 - 1, f"[{bar}]", bar_color | curses.A_BOLD)
-    safe_addstr(stdscr, bar_y + 1, state.width // 2 - 8, f"HP: {boss.hp}/{boss.max_hp}", curses.color_pair(7))
+    ctx.text(bar_y, state.width // 2 - bar_w // 2 - 1, f"[{bar}]", bar_color | curses.A_BOLD)
+    ctx.text(bar_y + 1, state.width // 2 - 8, f"HP: {boss.hp}/{boss.max_hp}", ctx.pairs[7])
 
 
-def render_typing(stdscr, state: GameState):
+def render_typing(ctx: RenderContext, state: GameState):
     if not state.typing:
         return
     
@@ -1182,92 +3337,125 @@ def render_typing(stdscr, state: GameState):
     bx = cx - box_w // 2
     
     # Box with double border
-    safe_addstr(stdscr, cy - 4, bx, '╔' + '═' * (box_w - 2) + '╗', curses.color_pair(4) | curses.A_BOLD)
+    ctx.text(cy - 4, bx, '╔' + '═' * (box_w - 2) + '╗', ctx.bold[4])
     for y in range(cy - 3, cy + 4):
-        safe_addstr(stdscr, y, bx, '║' + ' ' * (box_w - 2) + '║', curses.color_pair(4))
-    safe_addstr(stdscr, cy + 4, bx, '╚' + '═' * (box_w - 2) + '╝', curses.color_pair(4) | curses.A_BOLD)
+        ctx.text(y, bx, '║' + ' ' * (box_w - 2) + '║', ctx.pairs[4])
+    ctx.text(cy + 4, bx, '╚' + '═' * (box_w - 2) + '╝', ctx.bold[4])
     
     # Title
-    safe_addstr(stdscr, cy - 3, cx - 9, "⌨️  TYPING CHALLENGE  ⌨️", curses.color_pair(5) | curses.A_BOLD)
+    ctx.text(cy - 3, cx - 9, "⌨️  TYPING CHALLENGE  ⌨️", ctx.bold[5])
     
     # Instruction
-    safe_addstr(stdscr, cy - 1, cx - 8, "Type the word below:", curses.color_pair(7))
+    ctx.text(cy - 1, cx - 8, "Type the word below:", ctx.pairs[7])
     
     # Word display with character-by-character coloring
     word_x = cx - len(tc.word) // 2
     for i, char in enumerate(tc.word):
         if i < len(tc.typed):
             # Typed correctly
-            safe_addstr(stdscr, cy + 1, word_x + i, char.upper(), curses.color_pair(6) | curses.A_BOLD)
+            ctx.text(cy + 1, word_x + i, char.upper(), ctx.bold[6])
         else:
             # Not yet typed
-            safe_addstr(stdscr, cy + 1, word_x + i, char.upper(), curses.color_pair(7))
+            ctx.text(cy + 1, word_x + i, char.upper(), ctx.pairs[7])
     
     # Cursor
     cursor_pos = word_x + len(tc.typed)
     if tc.cursor_blink % 20 < 10:
-        safe_addstr(stdscr, cy + 1, cursor_pos, "▌", curses.color_pair(5) | curses.A_BOLD)
+        ctx.text(cy + 1, cursor_pos, "▌", ctx.bold[5])
     
     # Timer bar
     timer_w = 24
     filled = int(timer_w * (tc.timer / tc.max_timer))
     timer_bar = '█' * filled + '░' * (timer_w - filled)
-    timer_color = curses.color_pair(6) if filled > 8 else curses.color_pair(5) if filled > 4 else curses.color_pair(1)
-    safe_addstr(stdscr, cy + 3, cx - timer_w // 2 - 1, f"[{timer_bar}]", timer_color)
+    timer_color = ctx.pairs[6] if filled > 8 else ctx.pairs[5] if filled > 4 else ctx.pairs[1]
+    ctx.text(cy + 3, cx - timer_w // 2 - 1, f"[{timer_bar}]", timer_color)
     
     # Progress
     progress = f"{len(tc.typed)}/{len(tc.word)}"
-    safe_addstr(stdscr, cy + 3, cx + timer_w // 2 + 2, progress, curses.color_pair(7))
+    ctx.text(cy + 3, cx + timer_w // 2 + 2, progress, ctx.pairs[7])
+
 
+def maze_viewport(state: GameState) -> Tuple[int, int, int, int, int, int]:
+    """Visible window (x0, y0, cols, rows) and its screen origin (ox, oy).
+
+    Mazes that fit are centred as before; larger ones scroll so the player
+    stays in the middle, clamped at the maze edges.
+    """
+    maze = state.maze
+    oy = 4
+    cols = min(maze.width, (state.width - 2) // 2)
+    rows = min(maze.height, state.height - oy - 3)     # keep the message and controls rows
+    x0 = min(max(0, maze.player_x - cols // 2), maze.width - cols)
+    y0 = min(max(0, maze.player_y - rows // 2), maze.height - rows)
+    ox = (state.width - cols * 2) // 2
+    return x0, y0, cols, rows, ox, oy
+
+
+MAZE_TILES = {
+    MazeGame.WALL: ("▓▓", 7, curses.A_DIM),
+    MazeGame.PATH: ("  ", 7, 0),
+    MazeGame.START: ("🚪", 4, 0),
+    MazeGame.KEY: ("🔑", 5, curses.A_BOLD),
+}
 
-def render_maze(stdscr, state: GameState):
+
+def maze_row(maze: MazeGame, y: int, tiles: dict) -> tuple:
+    """Row `y` pre-rendered: the exit tile it was drawn with, and the
+    frame-buffer cells of the whole row (two per maze column)"""
+    chars, attrs = [], []
+    for cell, group in groupby(maze.maze[y * maze.width:(y + 1) * maze.width]):
+        char, attr = tiles[cell]
+        cells = text_cells(char) * sum(1 for _ in group)
+        chars += cells
+        attrs += [attr] * len(cells)
+    return tiles[MazeGame.EXIT], chars, attrs
+
+
+def render_maze(ctx: RenderContext, state: GameState):
     if not state.maze:
         return
     
     maze = state.maze
-    ox = (state.width - maze.width * 2) // 2
-    oy = 4
+    x0, y0, cols, rows, ox, oy = maze_viewport(state)
     
     # Title
-    safe_addstr(stdscr, 1, state.width // 2 - 12, "🔒 PRISON MAZE ESCAPE 🔒", curses.color_pair(1) | curses.A_BOLD)
-    safe_addstr(stdscr, 2, state.width // 2 - 15, f"🔑 Keys: {maze.keys}/3  |  WASD to move", curses.color_pair(7))
-    
-    # Draw maze
-    for y in range(maze.height):
-        for x in range(maze.width):
-            cell = maze.maze[y][x]
-            if cell == 0:
-                char = "▓▓"
-                color = curses.color_pair(7) | curses.A_DIM
-            elif cell == 1:
-                char = "  "
-                color = curses.color_pair(7)
-            elif cell == 2:
-                char = "🚪"
-                color = curses.color_pair(4)
-            elif cell == 3:
-                char = "🆓" if maze.keys >= 3 else "🔒"
-                color = curses.color_pair(6) if maze.keys >= 3 else curses.color_pair(1)
-            elif cell == 4:
-                char = "🔑"
-                color = curses.color_pair(5) | curses.A_BOLD
-            else:
-                char = "  "
-                color = curses.color_pair(7)
-            
-            safe_addstr(stdscr, oy + y, ox + x * 2, char, color)
+    ctx.text(1, state.width // 2 - 12, "🔒 PRISON MAZE ESCAPE 🔒", ctx.bold[1])
+    if maze.keys >= 3:
+        hint = f"🆓 Exit: {maze.exit_distance()} steps"
+    else:
+        hint = f"Nearest 🔑: {maze.key_distance()}  Exit: {maze.exit_distance()}"
+    ctx.text(2, state.width // 2 - 23, f"🔑 Keys: {maze.keys}/3  |  {hint}  |  WASD", ctx.pairs[7])
+    
+    if maze.keys >= 3:
+        exit_tile = ("🆓", ctx.pairs[6])
+    else:
+        exit_tile = ("🔒", ctx.pairs[1])
+    tiles = {cell: (char, ctx.pairs[pair] | attr)
+             for cell, (char, pair, attr) in MAZE_TILES.items()}
+    tiles[MazeGame.EXIT] = exit_tile
+    
+    # Draw the visible window only, from the cached rows
+    x1 = x0 + cols
+    spans = []
+    for row in range(rows):
+        cached = maze.row_cache.get(y0 + row)
+        if cached is None or cached[0] != exit_tile:
+            cached = maze.row_cache[y0 + row] = maze_row(maze, y0 + row, tiles)
+        _, chars, attrs = cached
+        spans.append((oy + row, ox, chars[x0 * 2:x1 * 2], attrs[x0 * 2:x1 * 2]))
+    ctx.blit(spans)
     
     # Player with animation
-    px, py = maze.player_x, maze.player_y
+    px, py = maze.player_x - x0, maze.player_y - y0
     player_char = "😀" if state.frame % 20 < 10 else "🏃"
-    safe_addstr(stdscr, oy + py, ox + px * 2, player_char, curses.color_pair(4) | curses.A_BOLD)
+    ctx.text(oy + py, ox + px * 2, player_char, ctx.bold[4])
 
 
-def render_ui(stdscr, state: GameState, player: Player):
+def render_ui(ctx: RenderContext, state: GameState, player: Player):
     data = ZONE_DATA[state.zone]
     
     # Zone name with icon
-    safe_addstr(stdscr, 0, 2, data['name'], curses.color_pair(data['color']) | curses.A_BOLD)
+    ctx.text(0, 2, data['name'], ctx.bold[data['color']])
     
     # Health bar with color gradient
     hp_pct = player.will / player.max_will
@@ -1281,40 +3469,40 @@ def render_ui(stdscr, state: GameState, player: Player):
         else:
             bar += "░"
     
-    hp_color = curses.color_pair(6) if hp_pct > 0.5 else curses.color_pair(5) if hp_pct > 0.25 else curses.color_pair(1)
+    hp_color = ctx.pairs[6] if hp_pct > 0.5 else ctx.pairs[5] if hp_pct > 0.25 else ctx.pairs[1]
     if hp_pct <= 0.25 and state.frame % 8 < 4:
         hp_color |= curses.A_BLINK
     
-    safe_addstr(stdscr, 0, 18, f"WILL:[{bar}]{player.will:3d}%", hp_color | curses.A_BOLD)
+    ctx.text(0, 18, f"WILL:[{bar}]{player.will:3d}%", hp_color | curses.A_BOLD)
     
     # Score with animation
-    score_color = curses.color_pair(5)
+    score_color = ctx.pairs[5]
     if player.combo > 5:
         score_color |= curses.A_BOLD
-    safe_addstr(stdscr, 0, state.width - 28, f"SCORE:{player.score:07d} AGE:{player.age:2d}", score_color)
+    ctx.text(0, state.width - 28, f"SCORE:{player.score:07d} AGE:{player.age:2d}", score_color)
     
     # Wanted level
     if player.wanted > 0:
         stars = '⭐' * player.wanted + '☆' * (5 - player.wanted)
-        wanted_color = curses.color_pair(1)
+        wanted_color = ctx.pairs[1]
         if state.frame % 8 < 4:
             wanted_color |= curses.A_BOLD
-        safe_addstr(stdscr, 1, state.width - len(stars) - 12, f"WANTED:{stars}", wanted_color)
+        ctx.text(1, state.width - text_width(stars) - 12, f"WANTED:{stars}", wanted_color)
     
     # Prison info
     if state.zone == Zone.PRISON:
         time_left = player.prison_time // 30
         keys_display = "🔑" * player.keys + "⬜" * (3 - player.keys)
-        safe_addstr(stdscr, 1, 2, f"⛓️ Time:{time_left:3d}s  Keys:{keys_display}", curses.color_pair(1) | curses.A_BOLD)
+        ctx.text(1, 2, f"⛓️ Time:{time_left:3d}s  Keys:{keys_display}", ctx.bold[1])
     
     # Combo
     if player.combo > 1:
-        combo_color = curses.color_pair(5)
+        combo_color = ctx.pairs[5]
         if player.combo >= 5:
-            combo_color = curses.color_pair(6) | curses.A_BOLD
+            combo_color = ctx.bold[6]
         if player.combo >= 10:
-            combo_color = curses.color_pair(2) | curses.A_BOLD
-        safe_addstr(stdscr, 1, 40, f"🔥 COMBO x{player.combo}", combo_color)
+            combo_color = ctx.bold[2]
+        ctx.text(1, 40, f"🔥 COMBO x{player.combo}", combo_color)
     
     # Power-up timers
     powerups = []
@@ -1325,15 +3513,15 @@ def render_ui(stdscr, state: GameState, player: Player):
     if player.rage > 0:
         powerups.append(f"🔥{player.rage//30}s")
     if powerups:
-        safe_addstr(stdscr, 2, 2, " ".join(powerups), curses.color_pair(5) | curses.A_BOLD)
+        ctx.text(2, 2, " ".join(powerups), ctx.bold[5])
     
     # Message
     if state.message_timer > 0:
-        msg_x = max(2, (state.width - len(state.message)) // 2)
-        attr = curses.color_pair(state.message_color) | curses.A_BOLD
+        msg_x = max(2, (state.width - text_width(state.message)) // 2)
+        attr = ctx.bold[state.message_color]
         if state.message_timer < 20:
             attr |= curses.A_DIM
-        safe_addstr(stdscr, state.height - 3, msg_x, state.message, attr)
+        ctx.text(state.height - 3, msg_x, state.message, attr)
     
     # Controls
     if state.mode == 'normal':
@@ -1345,43 +3533,78 @@ def render_ui(stdscr, state: GameState, player: Player):
     else:
         controls = "Survive the boss!  |  Build combos to deal damage!"
     
-    safe_addstr(stdscr, state.height - 1, (state.width - len(controls)) // 2, controls, curses.color_pair(7) | curses.A_DIM)
+    ctx.text(state.height - 1, (state.width - text_width(controls)) // 2, controls, ctx.pairs[7] | curses.A_DIM)
+    
+    if state.profiler and state.profiler.visible:
+        render_profiler(ctx, state)
+
+
+def render_profiler(ctx: RenderContext, state: GameState):
+    """Compact per-phase timing overlay in the top-right corner (F3)"""
+    rows = state.profiler.report()
+    box_w = 36
+    x = state.width - box_w - 1
+    attr = ctx.pairs[7]
+    frame = ctx.bold[4]
+    ctx.text(2, x, "┌─ frame ms ─── avg ── p99 ─ hist ─┐", frame)
+    for i, (name, avg, p99, hist) in enumerate(rows):
+        hot = ctx.bold[1] if p99 > FRAME_TIME * 1000 / 4 else attr
+        ctx.text(3 + i, x, f"│ {name:<12}{avg:6.2f}{p99:6.2f} {hist:<8}│", hot)
+    mazes = state.mazes
+    ctx.text(3 + len(rows), x,
+             f"│ {'mazes':<12}{mazes.hits:>6}{mazes.misses:>6} hit/miss│", attr)
+    ctx.text(4 + len(rows), x, "└" + "─" * (box_w - 2) + "┘", frame)
 
 
-def render_game(stdscr, state: GameState, player: Player):
-    stdscr.clear()
+def render_game(stdscr, state: GameState, player: Player, alpha: float = 0.0):
+    """Draw a frame; `alpha` is how far (0..1) real time is past the last tick"""
+    if state.paused:
+        alpha = 0.0
+    prof = state.profiler or NO_PROFILER
+    stdscr.erase()
+    ctx = RenderContext(stdscr)
     
     if state.mode == 'maze':
-        render_maze(stdscr, state)
+        render_maze(ctx, state)
+        prof.lap('r.maze')
     else:
-        render_background(stdscr, state)
+        render_background(ctx, state)
+        prof.lap('r.background')
         if state.mode == 'boss':
-            render_boss(stdscr, state)
-        render_entities(stdscr, state)
-        render_particles(stdscr, state)
-        render_player(stdscr, player, state)
-        render_floats(stdscr, state)
+            render_boss(ctx, state)
+            prof.lap('r.boss')
+        render_entities(ctx, state, alpha * 0.4 if player.coffee > 0 else alpha)
+        prof.lap('r.entities')
+        render_particles(ctx, state, alpha)
+        render_player(ctx, player, state)
+        render_floats(ctx, state, alpha)
+        prof.lap('r.sprites')
         
         if state.mode == 'typing':
-            render_typing(stdscr, state)
+            render_typing(ctx, state)
+            prof.lap('r.typing')
     
-    render_ui(stdscr, state, player)
+    render_ui(ctx, state, player)
+    prof.lap('r.ui')
     
     if state.paused:
         # Pause overlay
         pause_msg = "⏸ PAUSED ⏸"
-        px = state.width // 2 - len(pause_msg) // 2
+        pause_w = text_width(pause_msg)
+        px = state.width // 2 - pause_w // 2
         py = state.height // 2
-        safe_addstr(stdscr, py - 1, px - 2, "╔" + "═" * (len(pause_msg) + 2) + "╗", curses.color_pair(4))
-        safe_addstr(stdscr, py, px - 2, "║ " + pause_msg + " ║", curses.color_pair(4) | curses.A_BOLD)
-        safe_addstr(stdscr, py + 1, px - 2, "╚" + "═" * (len(pause_msg) + 2) + "╝", curses.color_pair(4))
-        safe_addstr(stdscr, py + 2, px - 1, "Press P to resume", curses.color_pair(7))
+        ctx.text(py - 1, px - 2, "╔" + "═" * (pause_w + 2) + "╗", ctx.pairs[4])
+        ctx.text(py, px - 2, "║ " + pause_msg + " ║", ctx.bold[4])
+        ctx.text(py + 1, px - 2, "╚" + "═" * (pause_w + 2) + "╝", ctx.pairs[4])
+        ctx.text(py + 2, px - 1, "Press P to resume", ctx.pairs[7])
     
     stdscr.refresh()
+    prof.lap('flush')
 
 
 def render_game_over(stdscr, state: GameState, player: Player):
-    stdscr.clear()
+    stdscr.erase()
+    ctx = RenderContext(stdscr)
     
     messages = [
         "Your will to live has flatlined",
@@ -1400,7 +3623,7 @@ def render_game_over(stdscr, state: GameState, player: Player):
         "║           G A M E   O V E R                    ║",
         "║                                                ║",
         "╠════════════════════════════════════════════════╣",
-        f"║  {random.choice(messages):^44}  ║",
+        f"║  {state.fx.choice(messages):^44}  ║",
         "╠════════════════════════════════════════════════╣",
         f"║  Score: {player.score:,}                                  ║"[:50] + "║",
         f"║  Age: {player.age}  |  Bosses: {player.bosses_defeated}  |  Tasks: {player.tasks_completed}          ║"[:50] + "║",
@@ -1415,16 +3638,42 @@ def render_game_over(stdscr, state: GameState, player: Player):
     start_x = cx - 25
     
     for i, line in enumerate(lines):
-        color = curses.color_pair(1) if i < 5 else curses.color_pair(7)
+        color = ctx.pairs[1] if i < 5 else ctx.pairs[7]
         if "GAME OVER" in line:
-            color = curses.color_pair(1) | curses.A_BOLD
-        safe_addstr(stdscr, start_y + i, start_x, line, color)
+            color = ctx.bold[1]
+        ctx.text(start_y + i, start_x, line, color)
+    
+    if state.leaderboard:
+        render_leaderboard(ctx, state, player, start_y + len(lines), start_x)
     
     stdscr.refresh()
 
 
+def render_leaderboard(ctx: RenderContext, state: GameState, player: Player, y: int, x: int):
+    """Top scores under the game-over box; blank until the queries come back"""
+    results = state.leaderboard.results
+    everyone, zone, today = (results.get(key) for key in Leaderboard.keys_for(state))
+    if state.leaderboard.error:
+        ctx.text(y, x + 2, f"🏆 scores unavailable: {state.leaderboard.error}"[:60],
+                 ctx.pairs[1] | curses.A_DIM)
+        return
+    if everyone is None:
+        ctx.text(y, x + 2, "🏆 loading scores...", ctx.pairs[3] | curses.A_DIM)
+        return
+    ctx.text(y, x + 2, "🏆 TOP SCORES", ctx.bold[3])
+    best_zone = f"{zone[0][0]:,}" if zone else "-"
+    best_today = f"{today[0][0]:,}" if today else "-"
+    ctx.text(y, x + 17, f"Zone best: {best_zone}  Today: {best_today}", ctx.pairs[7])
+    for i, (score, age, bosses, tasks, zone_name, day, seed) in enumerate(everyone[:LEADERBOARD_SIZE]):
+        mine = score == player.score and seed == state.seed
+        color = ctx.bold[6] if mine else ctx.pairs[7]
+        ctx.text(y + 1 + i, x + 2,
+                 f"{i + 1}. {score:>9,}  age {age:<3} {zone_name.title():<8} {day}", color)
+
+
 def render_title(stdscr, state: GameState):
-    stdscr.clear()
+    stdscr.erase()
+    ctx = RenderContext(stdscr)
     
     lines = [
         "╔═══════════════════════════════════════════════════════════════════╗",
@@ -1453,17 +3702,17 @@ def render_title(stdscr, state: GameState):
     ]
     
     start_y = (state.height - len(lines)) // 2
-    start_x = (state.width - 69) // 2
+    start_x = (state.width - text_width(lines[0])) // 2
     
     for i, line in enumerate(lines):
-        color = curses.color_pair(4)
+        color = ctx.pairs[4]
         if "LIFE" in line or "SIM" in line or "5.1" in line:
-            color = curses.color_pair(5) | curses.A_BOLD
+            color = ctx.bold[5]
         elif "Press ANY KEY" in line:
-            color = curses.color_pair(6) | curses.A_BOLD
+            color = ctx.bold[6]
             if state.frame % 20 < 10:
                 color |= curses.A_BLINK
-        safe_addstr(stdscr, start_y + i, max(0, start_x), line[:state.width-1], color)
+        ctx.text(start_y + i, max(0, start_x), line, color)
     
     stdscr.refresh()
 
@@ -1490,7 +3739,9 @@ def reset_game(state: GameState, player: Player):
     player.crimes = 0
     player.arrests = 0
     player.prison_time = 0
+    player.long_sentence = False
     player.keys = 0
+    player.bosses_fought = 0
     player.bosses_defeated = 0
     player.tasks_completed = 0
     
@@ -1498,9 +3749,10 @@ def reset_game(state: GameState, player: Player):
     state.paused = False
     state.zone = Zone.SCHOOL
     state.mode = 'normal'
+    state.zone_ticks.clear()
     state.frame = 0
     state.difficulty = 1.0
-    state.entities.clear()
+    clear_entities(state)
     state.particles.clear()
     state.floats.clear()
     state.typing = None
@@ -1509,10 +3761,547 @@ def reset_game(state: GameState, player: Player):
     state.boss_cooldown = 300
     state.challenge_cooldown = 300
     state.screen_shake = 0
+    state.run_recorded = False
     set_message(state, "🏫 Welcome to SCHOOL! Good luck!", 120, 6)
 
 
-def main(stdscr):
+# ═══════════════════════════════════════════════════════════════════════════
+# BALANCING HARNESS
+# ═══════════════════════════════════════════════════════════════════════════
+
+class RandomPolicy:
+    """Mashes keys: a baseline that plays no better than chance"""
+    KEYS = (None, None, None, EV_LEFT, EV_RIGHT, EV_UP, EV_DOWN, 'w', 'a', 's', 'd', 'e', 't')
+    
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+    
+    def __call__(self, state: GameState, player: Player):
+        return self.rng.choice(self.KEYS)
+
+
+class ScriptedPolicy:
+    """A plausible human: dodges bad items, chases good ones, types at ~9 keys/s"""
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+    
+    def __call__(self, state: GameState, player: Player):
+        rng = self.rng
+        if state.mode == 'typing' and state.typing and state.typing.active:
+            if rng.random() < 0.3:
+                return state.typing.word[len(state.typing.typed)]
+            return None
+        if state.mode == 'maze':
+            return rng.choice((EV_UP, EV_DOWN, EV_LEFT, EV_RIGHT))
+        
+        centre = player.x + 3
+        nearest = None
+        for e in state.entities:
+            if player.y - 8 < e.y < player.y + 1:
+                ex = e.x + e.width / 2
+                if nearest is None or abs(ex - centre) < abs(nearest[0] - centre):
+                    nearest = (ex, e.is_good)
+        if nearest is None:
+            return rng.choice((None, None, EV_LEFT, EV_RIGHT))
+        ex, good = nearest
+        if good:
+            return EV_LEFT if ex < centre else EV_RIGHT
+        if abs(ex - centre) < 8:
+            return EV_RIGHT if ex < centre else EV_LEFT
+        return None
+
+
+POLICIES = {'random': RandomPolicy, 'scripted': ScriptedPolicy}
+
+
+def play_one(job: Tuple[int, str, int]) -> dict:
+    """Play one seeded game to game over (or the tick cap); runs in a worker"""
+    seed, policy, max_ticks = job
+    sim = Simulation(seed=seed)
+    sim.run(max_ticks, POLICIES[policy](seed))
+    state, player = sim.state, sim.player
+    return {
+        'seed': seed,
+        'ticks': sim.ticks,
+        'died': state.game_over,
+        'score': player.score,
+        'age': player.age,
+        'bosses_fought': player.bosses_fought,
+        'bosses_defeated': player.bosses_defeated,
+        'tasks': player.tasks_completed,
+        'crimes': player.crimes,
+        'arrests': player.arrests,
+        'zone_ticks': {zone.name: n for zone, n in state.zone_ticks.items()},
+    }
+
+
+def _percentiles(values: List[float]) -> Optional[dict]:
+    if not values:
+        return None
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        'mean': sum(values) / len(values),
+        'p10': pick(0.10), 'p50': pick(0.50), 'p90': pick(0.90),
+        'min': values[0], 'max': values[-1],
+    }
+
+
+def summarize(results: List[dict]) -> dict:
+    games = len(results)
+    fought = sum(r['bosses_fought'] for r in results)
+    total_ticks = sum(r['ticks'] for r in results)
+    dwell = {zone.name: 0 for zone in Zone}
+    for r in results:
+        for zone, n in r['zone_ticks'].items():
+            dwell[zone] += n
+    per_game = lambda n: n / games if games else None
+    return {
+        'games': games,
+        'survival_ticks': _percentiles([r['ticks'] for r in results]),
+        'score': _percentiles([r['score'] for r in results]),
+        'death_rate': per_game(sum(r['died'] for r in results)),
+        'boss_win_rate': sum(r['bosses_defeated'] for r in results) / fought if fought else None,
+        'arrest_rate': per_game(sum(r['arrests'] > 0 for r in results)),
+        'zone_dwell': {zone: {'mean_ticks': per_game(n), 'share': n / total_ticks if total_ticks else 0}
+                       for zone, n in dwell.items()},
+    }
+
+
+def run_balance(games: int, policy: str = 'scripted', workers: Optional[int] = None,
+                max_ticks: int = 30 * 60 * 30, base_seed: int = 0) -> dict:
+    """Play `games` seeded games across a process pool and summarize them.
+
+    Seeds are base_seed .. base_seed + games - 1, so a summary can be
+    reproduced exactly. Games are independent, so throughput scales with
+    the number of worker processes.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [(base_seed + i, policy, max_ticks) for i in range(games)]
+    chunksize = max(1, games // (workers * 8))
+    if workers == 1:
+        results = [play_one(job) for job in jobs]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = list(pool.imap_unordered(play_one, jobs, chunksize))
+    results.sort(key=lambda r: r['seed'])
+    summary = summarize(results)
+    summary.update(policy=policy, base_seed=base_seed, max_ticks=max_ticks, workers=workers)
+    return summary
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BENCHMARKS
+# ═══════════════════════════════════════════════════════════════════════════
+
+class FakeScreen:
+    """Stand-in for a curses window that records what gets drawn on it"""
+    def __init__(self, height: int = MIN_HEIGHT, width: int = MIN_WIDTH, keys=()):
+        self.height = height
+        self.width = width
+        self.keys = list(keys)
+        self.addstr_calls = 0
+        self.chars_written = 0
+        self.refreshes = 0
+    
+    def getmaxyx(self) -> Tuple[int, int]:
+        return self.height, self.width
+    
+    def addstr(self, y: int, x: int, text: str, attr: int = 0):
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            raise curses.error("addwstr() returned ERR")
+        self.addstr_calls += 1
+        self.chars_written += len(text)
+    
+    def clear(self):
+        pass
+    
+    erase = clear
+    
+    def refresh(self):
+        self.refreshes += 1
+    
+    def getch(self) -> int:
+        return self.keys.pop(0) if self.keys else -1
+
+
+def _keep_boss(sim: Simulation):
+    if sim.state.mode != 'boss':
+        sim.state.zone = Zone.WORK
+        start_boss(sim.state, sim.player)
+
+
+def _keep_typing(sim: Simulation):
+    if sim.state.mode != 'typing':
+        start_typing(sim.state, sim.player)
+
+
+def _keep_maze(sim: Simulation):
+    if sim.state.mode != 'maze':
+        sim.state.zone = Zone.PRISON
+        start_maze(sim.state, sim.player)
+
+
+def _keep_crowded(sim: Simulation, count: int = 2000):
+    while len(sim.state.entities) < count:
+        spawn_entity(sim.state, sim.player)
+
+
+BENCH_SCENARIOS = {
+    'normal': (None, False),
+    'boss': (_keep_boss, False),
+    'typing': (_keep_typing, False),
+    'maze': (_keep_maze, False),
+    'stress': (_keep_crowded, False),
+}
+if np is not None:
+    BENCH_SCENARIOS['stress-arrays'] = (_keep_crowded, True)
+
+
+def bench_scenario(name: str, frames: int = 600, seed: int = 1,
+                   width: int = MIN_WIDTH, height: int = MIN_HEIGHT) -> dict:
+    """Time `frames` ticks and renders of one scripted scenario.
+
+    Update and render are timed separately; a second pass under tracemalloc
+    measures memory churn so it doesn't distort the timings.
+    """
+    keep, entity_arrays = BENCH_SCENARIOS[name]
+    
+    def setup():
+        sim = Simulation(width, height, entity_arrays, seed=seed)
+        window = FakeScreen(height, width)
+        return sim, window, FrameBuffer(window), ScriptedPolicy(seed)
+    
+    def prepare(sim: Simulation, policy):
+        sim.player.will = sim.player.max_will
+        if keep:
+            keep(sim)
+        return policy(sim.state, sim.player)
+    
+    clock = time.perf_counter
+    sim, window, screen, policy = setup()
+    tick_times, render_times = [], []
+    for _ in range(frames):
+        events = prepare(sim, policy)
+        t0 = clock()
+        sim.tick(events)
+        t1 = clock()
+        render_game(screen, sim.state, sim.player)
+        t2 = clock()
+        tick_times.append(t1 - t0)
+        render_times.append(t2 - t1)
+    
+    sim, _, churn_screen, policy = setup()
+    tracemalloc.start()
+    peaks, blocks = [], sys.getallocatedblocks()
+    for _ in range(frames):
+        events = prepare(sim, policy)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        sim.tick(events)
+        render_game(churn_screen, sim.state, sim.player)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    net_blocks = sys.getallocatedblocks() - blocks
+    
+    frame_times = sorted(t + r for t, r in zip(tick_times, render_times))
+    pick = lambda q: frame_times[min(len(frame_times) - 1, int(q * len(frame_times)))]
+    return {
+        'frames': frames,
+        'ticks_per_sec': frames / sum(tick_times),
+        'renders_per_sec': frames / sum(render_times),
+        'frame_p50_ms': pick(0.50) * 1000,
+        'frame_p99_ms': pick(0.99) * 1000,
+        'alloc_peak_kib_per_frame': sum(peaks) / len(peaks) / 1024,
+        'net_blocks_per_frame': net_blocks / frames,
+        'addstr_per_frame': window.addstr_calls / frames,
+        'bytes_per_frame': screen.total_bytes / frames,     # estimated, see FrameBuffer
+    }
+
+
+def run_benchmarks(frames: int = 600, names: Optional[List[str]] = None,
+                   baseline: Optional[dict] = None) -> dict:
+    """Run the benchmark scenarios, print a table and compare to `baseline`"""
+    results = {}
+    print(f"{'scenario':<14}{'ticks/s':>10}{'renders/s':>11}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'alloc KiB':>11}{'addstr':>8}{'~bytes':>8}")
+    for name in names or list(BENCH_SCENARIOS):
+        r = results[name] = bench_scenario(name, frames)
+        line = (f"{name:<14}{r['ticks_per_sec']:>10.0f}{r['renders_per_sec']:>11.0f}"
+                f"{r['frame_p50_ms']:>9.3f}{r['frame_p99_ms']:>9.3f}"
+                f"{r['alloc_peak_kib_per_frame']:>11.1f}{r['addstr_per_frame']:>8.0f}"
+                f"{r['bytes_per_frame']:>8.0f}")
+        old = (baseline or {}).get('scenarios', {}).get(name)
+        if old:
+            change = r['frame_p50_ms'] / old['frame_p50_ms'] - 1
+            line += f"  p50 {change:+.0%}" + ("  << REGRESSION" if change > 0.10 else "")
+        print(line)
+    return {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__ if np is not None else None,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scenarios': results,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class Session:
+    """One remote player: a headless game, its frame buffer and its socket"""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 width: int, height: int, leaderboard: Optional[Leaderboard] = None,
+                 telemetry: Optional[Telemetry] = None):
+        self.sim = Simulation(width, height)
+        self.sim.state.leaderboard = leaderboard
+        self.sim.state.telemetry = telemetry
+        self.screen = FrameBuffer(None, height, width)
+        self.reader = reader
+        self.writer = writer
+        self.events: List[str] = []
+        self.started = False            # on the title screen until the first key
+        self.dropped = 0
+        self.screen.sinks.append(self.send)
+    
+    async def read_input(self):
+        tail = b''
+        while self.sim.state.running:
+            data = await self.reader.read(256)
+            if not data:
+                break
+            events, tail = decode_keys(tail + data)
+            if events and not self.started:
+                self.started = True
+                reset_game(self.sim.state, self.sim.player)
+                continue
+            # Input beyond a few ticks' worth is noise (or a paste); drop it
+            self.events.extend(events[:64 - len(self.events)])
+        self.sim.state.running = False
+    
+    def tick(self):
+        if self.started:
+            self.sim.tick(self.events)
+            self.events = []
+            if self.sim.state.leaderboard:
+                self.sim.state.leaderboard.watch(self.sim.state, self.sim.player)
+        else:
+            self.sim.state.frame += 1
+    
+    def draw(self):
+        """Render and queue one frame, or skip it while the client lags behind"""
+        if self.writer.transport.get_write_buffer_size() > SESSION_BACKLOG:
+            self.dropped += 1
+            self.screen.invalidate()
+            return
+        state, player, screen = self.sim.state, self.sim.player, self.screen
+        if not self.started:
+            render_title(screen, state)
+        elif state.game_over:
+            render_game_over(screen, state, player)
+        else:
+            render_game(screen, state, player)
+    
+    def send(self, runs: List[Tuple[int, int, str, int]], full: bool):
+        if runs:
+            self.writer.write(encode_ansi(runs, full))
+
+
+class GameServer:
+    """Many independent games in one process, streamed as ANSI over sockets.
+
+    Every session ticks at TARGET_FPS from one shared fixed-timestep
+    scheduler, and frames go out at `fps` as FrameBuffer diffs. A client
+    that cannot keep up skips frames (and gets a full repaint once it
+    drains) instead of queueing them, which keeps per-session memory
+    bounded. Connect with a raw-mode terminal:
+    `stty raw -echo; nc HOST PORT; stty sane`.
+    """
+    def __init__(self, width: int = MIN_WIDTH, height: int = MIN_HEIGHT,
+                 fps: int = SERVER_FPS, max_sessions: int = SERVER_MAX_SESSIONS,
+                 leaderboard: Optional[Leaderboard] = None,
+                 telemetry: Optional[Telemetry] = None):
+        self.width = width
+        self.height = height
+        self.render_every = max(1, round(TARGET_FPS / fps))
+        self.max_sessions = max_sessions
+        self.leaderboard = leaderboard
+        self.telemetry = telemetry
+        self.sessions: List[Session] = []
+    
+    async def serve(self, address: str):
+        """Listen on `address`: PORT, HOST:PORT, or a Unix socket path"""
+        backlog = max(100, self.max_sessions)
+        if '/' in address:
+            server = await asyncio.start_unix_server(self._connect, address, backlog=backlog)
+        else:
+            host, _, port = address.rpartition(':')
+            server = await asyncio.start_server(self._connect, host or '127.0.0.1', int(port),
+                                                backlog=backlog)
+        async with server:
+            await self._schedule()
+    
+    async def _connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self.sessions) >= self.max_sessions:
+            writer.write(b"Server full, try again later.\r\n")
+            writer.close()
+            return
+        session = Session(reader, writer, self.width, self.height, self.leaderboard,
+                          self.telemetry)
+        self.sessions.append(session)
+        try:
+            await session.read_input()
+        except ConnectionError:
+            session.sim.state.running = False
+    
+    def _close(self, session: Session):
+        if session in self.sessions:
+            self.sessions.remove(session)
+        if not session.writer.is_closing():
+            try:
+                session.writer.write(ANSI_RESET.encode())
+            except (ConnectionError, RuntimeError):
+                pass
+            session.writer.close()
+    
+    async def _schedule(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        ticks = 0
+        while True:
+            ticks += 1
+            draw = ticks % self.render_every == 0
+            for session in list(self.sessions):
+                try:
+                    if not session.sim.state.running or session.writer.is_closing():
+                        self._close(session)
+                        continue
+                    session.tick()
+                    if draw:
+                        session.draw()
+                except Exception as exc:
+                    # One broken game or dead socket must not stall the others
+                    print(f"closing session after error: {exc!r}", file=sys.stderr)
+                    session.sim.state.running = False
+                    self._close(session)
+            next_tick += FRAME_TIME
+            delay = next_tick - loop.time()
+            if delay < -FRAME_TIME * MAX_CATCHUP_TICKS:
+                next_tick = loop.time()     # too far behind: drop the backlog
+            await asyncio.sleep(max(0.0, delay))
+
+
+class SpectatorFeed:
+    """Publishes every frame of a FrameBuffer to viewers on a Unix socket.
+
+    Each frame is encoded once, on the game's thread, and the same bytes go
+    to every viewer from a small asyncio loop on its own thread. Normal
+    frames carry only the cell diffs; every `keyframe_every` frames a full
+    repaint goes out instead. A viewer that joins mid-stream gets the last
+    keyframe plus the diffs since, so it is in sync at once. A viewer that
+    falls behind sends nothing until the next keyframe.
+    """
+    def __init__(self, path: str, keyframe_every: int = SPECTATOR_KEYFRAME):
+        self.path = path
+        self.keyframe_every = keyframe_every
+        self.frames = 0
+        self.keyframe = b''
+        self.since: List[bytes] = []
+        self.viewers: Dict[asyncio.StreamWriter, bool] = {}     # writer -> in sync
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.error: Optional[Exception] = None
+        self.thread = threading.Thread(target=self._run, name='spectators', daemon=True)
+        self.thread.start()
+        if not self.ready.wait(SPECTATOR_START_TIMEOUT):
+            raise TimeoutError(f"spectator socket {path} did not open")
+        if self.error:
+            raise self.error
+    
+    def attach(self, screen: 'FrameBuffer'):
+        screen.sinks.append(lambda runs, full: self.publish(screen, runs, full))
+    
+    def publish(self, screen: 'FrameBuffer', runs: List[Tuple[int, int, str, int]], full: bool):
+        key = full or self.frames % self.keyframe_every == 0
+        self.frames += 1
+        if key:
+            data = encode_ansi(frame_runs(screen), True)
+        elif runs:
+            data = encode_ansi(runs)
+        else:
+            return
+        self.loop.call_soon_threadsafe(self._broadcast, data, key)
+    
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+    
+    def _broadcast(self, data: bytes, key: bool):
+        if key:
+            self.keyframe = data
+            self.since = []
+        else:
+            self.since.append(data)
+        for writer, synced in list(self.viewers.items()):
+            if writer.is_closing():
+                del self.viewers[writer]
+            elif writer.transport.get_write_buffer_size() > SESSION_BACKLOG:
+                self.viewers[writer] = False
+            elif key or synced:
+                writer.write(data)
+                self.viewers[writer] = True
+    
+    async def _connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.write(self.keyframe + b''.join(self.since))
+        self.viewers[writer] = True
+        try:
+            while await reader.read(256):
+                pass                        # viewers only watch
+        except ConnectionError:
+            pass
+        self.viewers.pop(writer, None)
+        writer.close()
+    
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            if os.path.exists(self.path):
+                os.unlink(self.path)        # stale socket from an earlier run
+            server = self.loop.run_until_complete(asyncio.start_unix_server(self._connect, self.path))
+        except Exception as exc:
+            self.error = exc                # re-raised by __init__
+            self.loop.close()
+            return
+        finally:
+            self.ready.set()
+        self.loop.run_forever()
+        server.close()
+        for writer in self.viewers:
+            writer.close()
+        self.loop.run_until_complete(server.wait_closed())
+        os.unlink(self.path)
+
+
+def watch(path: str):
+    """Copy a spectator feed to this terminal until it ends or Ctrl+C"""
+    out = sys.stdout.buffer
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(path)
+        try:
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                out.write(data)
+                out.flush()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            out.write(ANSI_RESET.encode())
+            out.flush()
+
+
+def main(stdscr, options: Optional[argparse.Namespace] = None):
     curses.curs_set(0)
     stdscr.nodelay(True)
     stdscr.keypad(True)
@@ -1526,13 +4315,60 @@ def main(stdscr):
     
     init_colors()
     
-    state = GameState(width, height)
-    player = Player(width // 2, height - 7)
+    record = bool(options and options.record)
+    seed = options and options.seed
+    saves = None
+    if options and options.save and not record and seed is None:
+        saves = SaveFile(options.save)
+    sim = saves and saves.load(width, height)
+    resumed = sim is not None
+    if not resumed:
+        sim = Simulation(width, height, seed=seed, record=record)
+    sim.state.profiler = FrameProfiler(log_path=options and options.profile_log)
+    if options and options.leaderboard:
+        sim.state.leaderboard = Leaderboard(options.leaderboard)
+    if options and options.telemetry:
+        sim.state.telemetry = Telemetry(options.telemetry)
+    screen = FrameBuffer(stdscr)
+    feed = None
+    if options and options.spectate:
+        try:
+            feed = SpectatorFeed(options.spectate)
+        except OSError as exc:
+            set_message(sim.state, f"Spectating off: {exc.strerror or exc}", 150, 1)
+        else:
+            feed.attach(screen)
+    sim.state.mazes.start()
+    try:
+        play(stdscr, screen, sim, saves, resumed)
+    finally:
+        if feed:
+            feed.close()
+        if sim.state.leaderboard:
+            sim.state.leaderboard.close()
+        if sim.state.telemetry:
+            sim.state.telemetry.close()
+        sim.state.mazes.stop()
+        sim.state.profiler.close()
+        if saves:
+            if sim.state.game_over:
+                saves.discard()
+            else:
+                saves.submit(save_snapshot(sim))
+            saves.close()
+        if record:
+            Path(options.record).write_bytes(sim.recorder.finish(sim.ticks))
+
+
+def play(stdscr, screen: FrameBuffer, sim: Simulation,
+         saves: Optional[SaveFile] = None, resumed: bool = False):
+    state, player = sim.state, sim.player
     
     # Title screen
+    frame = state.frame
     state.frame = 0
     while True:
-        render_title(stdscr, state)
+        render_title(screen, state)
         state.frame += 1
         key = stdscr.getch()
         if key != -1:
@@ -1540,42 +4376,190 @@ def main(stdscr):
         time.sleep(0.05)
     
     stdscr.nodelay(True)
-    reset_game(state, player)
+    if resumed:
+        state.frame = frame
+        set_message(state, "💾 Welcome back! Game resumed", 90, 6)
+    else:
+        reset_game(state, player)
+    last_save = sim.ticks
     
+    # Fixed-timestep loop: the simulation always advances in FRAME_TIME steps
+    # of game time, catching up with extra ticks (up to MAX_CATCHUP_TICKS)
+    # when rendering falls behind, so a slow terminal never slows the game.
+    clock = time.perf_counter
+    prof = state.profiler
+    previous = clock()
+    lag = FRAME_TIME
+    events = []
     while state.running:
-        frame_start = time.time()
+        now = clock()
+        lag += now - previous
+        previous = now
+        prof.start_frame()
         
-        result = handle_input(stdscr, state, player)
-        if result == 'restart':
-            reset_game(state, player)
-            continue
+        # Keys pile up until the next tick applies them all at once
+        events.extend(read_events(stdscr))
+        if EV_PROFILER in events:
+            prof.visible = not prof.visible
+            events = [e for e in events if e != EV_PROFILER]
+        prof.lap('input')
         
-        # Update typing timer
-        if state.typing and state.typing.active:
-            state.typing.update(FRAME_TIME)
-            if not state.typing.active and not state.typing.success:
-                set_message(state, "⏰ Time's up! Task failed.", 60, 1)
-                state.mode = 'normal'
-                state.typing = None
+        steps = 0
+        while lag >= FRAME_TIME and steps < MAX_CATCHUP_TICKS:
+            sim.tick(events)
+            events = []
+            lag -= FRAME_TIME
+            steps += 1
+        if lag >= FRAME_TIME:
+            lag %= FRAME_TIME               # too far behind: drop the backlog
         
-        # Update maze
-        if state.maze:
-            state.maze.update()
+        if state.leaderboard:
+            state.leaderboard.watch(state, player)
+        
+        # Snapshotting takes well under a millisecond; the disk write
+        # happens on the save thread
+        if saves and sim.ticks - last_save >= AUTOSAVE_TICKS:
+            last_save = sim.ticks
+            if state.game_over:
+                saves.discard()
+            else:
+                saves.submit(save_snapshot(sim))
+        prof.lap('save')
         
         if not state.game_over:
-            update_game(state, player)
-            render_game(stdscr, state, player)
+            alpha = lag / FRAME_TIME if INTERPOLATE_RENDER else 0.0
+            render_game(screen, state, player, alpha)
         else:
-            render_game_over(stdscr, state, player)
+            render_game_over(screen, state, player)
+        prof.end_frame()
         
-        elapsed = time.time() - frame_start
-        if elapsed < FRAME_TIME:
-            time.sleep(FRAME_TIME - elapsed)
+        delay = FRAME_TIME - lag - (clock() - previous)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _seed(text: str) -> int:
+    """--seed value: replays and saves store seeds as unsigned 64-bit ints"""
+    seed = int(text)
+    if not 0 <= seed < 2 ** 64:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {2 ** 64 - 1}")
+    return seed
+
+
+def _positive(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return value
+
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Life Simulator - terminal edition")
+    parser.add_argument('--seed', type=_seed, help="seed for a reproducible run (0 to 2**64-1)")
+    parser.add_argument('--record', metavar='PATH', help="save a replay of the session to PATH")
+    parser.add_argument('--replay', metavar='PATH', help="re-simulate a recorded session headless")
+    parser.add_argument('--seek', type=int, metavar='TICK',
+                        help="with --replay, stop at TICK, starting from the nearest keyframe")
+    parser.add_argument('--save', metavar='PATH', default=str(SAVE_PATH),
+                        help=f"autosave file, resumed on startup (default: {SAVE_PATH})")
+    parser.add_argument('--no-save', dest='save', action='store_const', const=None,
+                        help="disable autosave and resume")
+    parser.add_argument('--profile-log', metavar='PATH',
+                        help="write per-frame phase timings (CSV, ms) to PATH")
+    parser.add_argument('--serve', metavar='ADDRESS',
+                        help="host many games over sockets: PORT, HOST:PORT or a Unix socket path")
+    parser.add_argument('--server-fps', type=int, default=SERVER_FPS,
+                        help=f"frames streamed per second with --serve (default: {SERVER_FPS})")
+    parser.add_argument('--max-sessions', type=int, default=SERVER_MAX_SESSIONS,
+                        help=f"concurrent games with --serve (default: {SERVER_MAX_SESSIONS})")
+    parser.add_argument('--leaderboard', metavar='PATH', default=str(LEADERBOARD_PATH),
+                        help=f"SQLite leaderboard (default: {LEADERBOARD_PATH})")
+    parser.add_argument('--no-leaderboard', dest='leaderboard', action='store_const', const=None,
+                        help="do not record or show high scores")
+    parser.add_argument('--top', type=int, nargs='?', const=10, metavar='N',
+                        help="print the N best runs from the leaderboard and exit")
+    parser.add_argument('--telemetry', metavar='PATH',
+                        help="log gameplay events as JSON lines to PATH (rotated)")
+    parser.add_argument('--spectate', metavar='SOCKET',
+                        help="publish the game to spectators on a Unix socket")
+    parser.add_argument('--watch', metavar='SOCKET', help="watch a game published with --spectate")
+    parser.add_argument('--balance', type=_positive, metavar='GAMES',
+                        help="play GAMES seeded headless games and write a balance summary")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='scripted',
+                        help="input policy for --balance (default: scripted)")
+    parser.add_argument('--workers', type=int, help="worker processes for --balance (default: all cores)")
+    parser.add_argument('--max-ticks', type=int, default=30 * 60 * 30,
+                        help="tick cap per --balance game (default: 30 minutes)")
+    parser.add_argument('--out', metavar='PATH', default='balance.json',
+                        help="summary file for --balance (default: balance.json)")
+    parser.add_argument('--bench', nargs='*', metavar='SCENARIO',
+                        help="run the update/render benchmarks (all scenarios if none given)")
+    parser.add_argument('--bench-frames', type=int, default=600, help="frames per benchmark scenario")
+    parser.add_argument('--bench-save', metavar='PATH', help="write benchmark results as JSON")
+    parser.add_argument('--bench-baseline', metavar='PATH', help="compare against saved results")
+    return parser.parse_args(argv)
 
-def run_game():
+
+def print_summary(sim: Simulation):
+    state, player = sim.state, sim.player
+    print(f"seed {state.seed}  ticks {sim.ticks}  zone {ZONE_DATA[state.zone]['name']}")
+    print(f"score {player.score:,}  age {player.age}  will {player.will}  "
+          f"bosses {player.bosses_defeated}  tasks {player.tasks_completed}  "
+          f"crimes {player.crimes}  arrests {player.arrests}")
+
+
+def run_game(argv: Optional[List[str]] = None):
+    options = parse_args(argv)
+    if options.replay:
+        print_summary(replay(Path(options.replay).read_bytes(), options.seek))
+        return
+    if options.bench is not None:
+        baseline = None
+        if options.bench_baseline:
+            baseline = json.loads(Path(options.bench_baseline).read_text())
+        results = run_benchmarks(options.bench_frames, options.bench or None, baseline)
+        if options.bench_save:
+            Path(options.bench_save).write_text(json.dumps(results, indent=2))
+        return
+    if options.watch:
+        watch(options.watch)
+        return
+    if options.top:
+        board = Leaderboard(options.leaderboard or LEADERBOARD_PATH)
+        for i, (score, age, bosses, tasks, zone, day, seed) in enumerate(board.top(('all',), options.top)):
+            print(f"{i + 1:>3}. {score:>10,}  age {age:<3} bosses {bosses:<2} tasks {tasks:<3} "
+                  f"{zone.title():<8} {day}  seed {seed}")
+        board.close()
+        if board.error:
+            sys.exit(f"leaderboard {board.path}: {board.error}")
+        return
+    if options.serve:
+        board = Leaderboard(options.leaderboard) if options.leaderboard else None
+        telemetry = Telemetry(options.telemetry) if options.telemetry else None
+        server = GameServer(fps=options.server_fps, max_sessions=options.max_sessions,
+                            leaderboard=board, telemetry=telemetry)
+        print(f"Serving Life Simulator on {options.serve} (Ctrl+C to stop)")
+        try:
+            asyncio.run(server.serve(options.serve))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if board:
+                board.close()
+            if telemetry:
+                telemetry.close()
+        return
+    if options.balance is not None:
+        started = time.perf_counter()
+        summary = run_balance(options.balance, options.policy, options.workers,
+                              options.max_ticks, options.seed or 0)
+        Path(options.out).write_text(json.dumps(summary, indent=2))
+        print(f"{options.balance} games in {time.perf_counter() - started:.1f}s "
+              f"on {summary['workers']} workers -> {options.out}")
+        return
+    
     try:
-        curses.wrapper(main)
+        curses.wrapper(main, options)
     except KeyboardInterrupt:
         pass
     finally: